@@ -1,12 +1,37 @@
 """Module containing agent implementations for the 20 questions game."""
 # pylint: disable-msg=C0301,R0903,W0718,W0201
 import random
-from typing import Tuple
+import re
+from typing import List, Optional, Tuple
 
+import tracing
+from cache import AnswerCache
 from game_state import GameState
-from llm import LLMInterface
+from llm import LLMInterface, Prompt
+from strategy import InformationGainStrategy
+from topics import TopicCatalog
 from validator import QuestionValidator
 
+# LLM role used for candidate pool requests, whose responses span several lines
+CANDIDATES_ROLE = "guesser_candidates"
+
+_CANDIDATE_LINE = re.compile(r"^\s*\d+\s*[.):-]\s*(.+?)\s*$", re.MULTILINE)
+
+
+def parse_candidates(response: str) -> List[str]:
+    """Extract the questions from a numbered candidate list, in rank order.
+
+    Args:
+        response: LLM response with lines like '1. Is it alive?'
+
+    Returns:
+        The candidate questions; an unnumbered response counts as a single candidate
+    """
+    candidates = _CANDIDATE_LINE.findall(response)
+    if not candidates and response.strip():
+        candidates = [response.strip().splitlines()[0]]
+    return candidates
+
 
 class BaseAgent:
     """Base class for game agents providing common functionality."""
@@ -18,25 +43,61 @@ class BaseAgent:
 
     def get_context(self, game_state: GameState) -> str:
         """Generate context string based on game history"""
-        context = "Previous questions and answers:\n"
-        for question, answer in zip(game_state.previous_questions, game_state.previous_answers):
-            context += f"Q: {question}\nA: {'Yes' if answer else 'No'}\n"
-        return context
+        return game_state.context
 
 
 class HostAgent(BaseAgent):
     """Agent implementation for the host role in 20 questions game."""
 
+    def __init__(
+        self,
+        name: str,
+        role: str,
+        llm: LLMInterface = None,
+        answer_cache: Optional[AnswerCache] = None,
+        topic_catalog: Optional[TopicCatalog] = None,
+        seed: Optional[int] = None,
+    ):
+        """Initialize the host.
+
+        Args:
+            name: Agent name
+            role: Agent role, 'host'
+            llm: LLM interface
+            answer_cache: Optional answer cache shared across games
+            topic_catalog: Optional catalog to sample topics from and answer known attributes with
+            seed: Seed for topic sampling, random when None
+        """
+        super().__init__(name, role, llm)
+        self.answer_cache = answer_cache
+        self.topic_catalog = topic_catalog
+        self._rng = random.Random(seed)
+
     def choose_topic(self) -> str:
-        """Use LLM to generate a random topic"""
+        """Sample a topic from the catalog, or fall back to the default topic without one"""
+        if self.topic_catalog is not None and len(self.topic_catalog):
+            return self.topic_catalog.sample(self._rng)
         return "Quantum supercomputer"
 
-    def answer_question(self, question: str, topic: str) -> bool:
-        """Generate yes/no answer using LLM"""
-        answer_prompt = f"""
-        You are hosting a 20 questions game. The secret topic is '{topic}'.
-        User is asking the following question:
-        Question: {question}
+    def _known_answer(self, question: str, topic: str) -> Optional[bool]:
+        """Answer from the topic catalog or the answer cache, without calling the LLM"""
+        if self.topic_catalog is not None:
+            catalog_answer = self.topic_catalog.lookup(topic, question)
+            if catalog_answer is not None:
+                return catalog_answer
+        if self.answer_cache is not None:
+            return self.answer_cache.get(topic, question)
+        return None
+
+    def build_answer_prompt(self, question: str, topic: str) -> Prompt:
+        """Build the prompt asking the LLM to answer a question about the topic.
+
+        The instructions are identical for every game and the topic for every turn of a game,
+        so both form the cacheable part; only the question changes per call.
+        """
+        return Prompt(
+            system="""
+        You are hosting a 20 questions game. The user is asking a question about the secret topic.
         Do you think the question is related to this topic?
         You are only expected to answer with just 'yes' or 'no', nothing else.
 
@@ -51,25 +112,81 @@ class HostAgent(BaseAgent):
 
         Q: Is a food?
         A: yes
-        """
+        """,
+            prefix=f"The secret topic is '{topic}'.",
+            suffix=f"Question: {question}",
+        )
+
+    def answer_question(self, question: str, topic: str) -> bool:
+        """Generate yes/no answer using LLM, consulting the topic catalog and answer cache first"""
+        known_answer = self._known_answer(question, topic)
+        if known_answer is not None:
+            return known_answer
+
+        try:
+            answer_prompt = self.build_answer_prompt(question, topic)
+            answer = self.llm.generate_response(answer_prompt, agent=self.name, role=self.role) == "yes"
+        except Exception:
+            return False
+
+        if self.answer_cache is not None:
+            self.answer_cache.put(topic, question, answer)
+        return answer
+
+    async def answer_question_async(self, question: str, topic: str) -> bool:
+        """Asynchronous version of answer_question"""
+        known_answer = self._known_answer(question, topic)
+        if known_answer is not None:
+            return known_answer
 
         try:
-            answer = self.llm.generate_response(answer_prompt)
-            return answer == "yes"
+            answer_prompt = self.build_answer_prompt(question, topic)
+            answer = (
+                await self.llm.generate_response_async(answer_prompt, agent=self.name, role=self.role)
+                == "yes"
+            )
         except Exception:
             return False
 
+        if self.answer_cache is not None:
+            self.answer_cache.put(topic, question, answer)
+        return answer
+
 
 class GuesserAgent(BaseAgent):
     """Agent implementation for the guesser role in 20 questions game."""
 
-    def __init__(self, name: str, role: str, llm: LLMInterface):
+    def __init__(
+        self,
+        name: str,
+        role: str,
+        llm: LLMInterface,
+        num_candidates: int = 1,
+        strategy: Optional[InformationGainStrategy] = None,
+    ):
+        """Initialize the guesser.
+
+        Args:
+            name: Agent name
+            role: Agent role, 'guesser'
+            llm: LLM interface
+            num_candidates: Questions requested per LLM call; when above 1 the valid spares are
+                kept on the game state as fallbacks instead of re-prompting
+            strategy: Optional local strategy proposing questions before the LLM is asked
+        """
         super().__init__(name, role, llm)
         self.validator = QuestionValidator()
+        self.num_candidates = num_candidates
+        self.strategy = strategy
 
-    def generate_question(self, game_state: GameState) -> Tuple[bool, str]:
-        """Generate next question based on game history with validation"""
-        question_prompt = f"""
+    def build_question_prompt(self, game_state: GameState) -> Prompt:
+        """Build the prompt asking the LLM for the next question.
+
+        The rules are static and the Q&A history only grows by appending, so both are sent as
+        the cacheable part ahead of the per-turn instruction.
+        """
+        return Prompt(
+            system="""
             You are playing 20 questions. Generate the next yes/no question based on previous Q&A:
 
             Rules:
@@ -78,16 +195,89 @@ class GuesserAgent(BaseAgent):
             3. Please don't ask similar questions to waste your chance
 
             Narrow down the question based on previous Q&A
-
+            """,
+            prefix=f"Previous Q&A: {self.get_context(game_state)}",
+            suffix=f"""
             Questions asked so far: {game_state.questions_asked}/20.
-            Previous Q&A: {self.get_context(game_state)}
-
             Now giving your question based on the previous Q&As and approaching to the correct answer.
             Only the question, no need to give out explaination
-        """
+            """,
+        )
 
-        try:
-            question = self.llm.generate_response(question_prompt)
+    def build_candidates_prompt(self, game_state: GameState) -> Prompt:
+        """Build the prompt asking the LLM for several ranked candidate questions"""
+        return Prompt(
+            system=f"""
+            You are playing 20 questions. Generate the {self.num_candidates} best next yes/no questions based on previous Q&A,
+            ranked from most to least useful:
+
+            Rules:
+            1. Question must be answerable with yes/no only
+            2. Preassumably start with: is/does/can/will/has/are/would/could/should
+            3. Please don't ask similar questions to waste your chance, neither to previous ones nor to each other
+
+            Narrow down the question based on previous Q&A
+            """,
+            prefix=f"Previous Q&A: {self.get_context(game_state)}",
+            suffix=f"""
+            Questions asked so far: {game_state.questions_asked}/20.
+            Give exactly {self.num_candidates} lines formatted as "1. <question>", "2. <question>" and so on.
+            Only the questions, no need to give out explaination
+            """,
+        )
+
+    def _build_prompt(self, game_state: GameState) -> Tuple[Prompt, str]:
+        """Prompt and LLM role for the next request, depending on the candidate pool size"""
+        if self.num_candidates > 1:
+            return self.build_candidates_prompt(game_state), CANDIDATES_ROLE
+        return self.build_question_prompt(game_state), self.role
+
+    def take_strategy_question(self, game_state: GameState) -> Optional[str]:
+        """Best valid question proposed by the local strategy, if any"""
+        if self.strategy is None:
+            return None
+        with tracing.span("strategy", agent=self.name):
+            ranked = self.strategy.rank_questions(game_state)
+        for question, _ in ranked:
+            is_valid, _ = self.validate_question(question, game_state)
+            if is_valid:
+                return question
+            # Keep the rejection from being logged again on every later turn
+            self.strategy.reject(question, game_state)
+        return None
+
+    def local_question(self, game_state: GameState) -> Optional[str]:
+        """Question available without an LLM call: from the strategy, else from the candidate pool"""
+        question = self.take_strategy_question(game_state)
+        if question is None:
+            question = self.take_pooled_question(game_state)
+        return question
+
+    def take_pooled_question(self, game_state: GameState) -> Optional[str]:
+        """Pop spare candidates from the game state until one is still valid for the current history"""
+        while game_state.candidate_questions:
+            question = game_state.candidate_questions.pop(0)
+            is_valid, _ = self.validate_question(question, game_state)
+            if is_valid:
+                return question
+        return None
+
+    def _accept_response(self, response: str, game_state: GameState) -> Tuple[bool, str, List[str]]:
+        """Validate an LLM response, returning the ranked candidates beyond the first valid one as spares"""
+        if self.num_candidates <= 1:
+            return (*self.validate_question(response, game_state), [])
+
+        candidates = parse_candidates(response)
+        error_msg = "No candidate questions in response"
+        for index, candidate in enumerate(candidates):
+            is_valid, error_msg = self.validate_question(candidate, game_state)
+            if is_valid:
+                return True, candidate, candidates[index + 1 :]
+        return False, error_msg, []
+
+    def validate_question(self, question: str, game_state: GameState) -> Tuple[bool, str]:
+        """Run format and similarity validation on a generated question"""
+        with tracing.span("validation", agent=self.name):
             is_valid, error_msg = self.validator.is_valid_question(question=question, game_state=game_state)
             if not is_valid:
                 return False, error_msg
@@ -99,9 +289,56 @@ class GuesserAgent(BaseAgent):
             if is_repeated_question:
                 return False, error_msg
 
-            return True, question
+        return True, question
+
+    def request_question(self, game_state: GameState) -> Tuple[bool, str, List[str]]:
+        """Ask the LLM for the next question, skipping the strategy and the candidate pool.
+
+        Returns:
+            Tuple[bool, str, List[str]]: Validity, the question or error message, and the spare
+                candidates of the response, which the caller pools if it uses the question
+        """
+        try:
+            prompt, role = self._build_prompt(game_state)
+            response = self.llm.generate_response(prompt, agent=self.name, role=role)
+            return self._accept_response(response, game_state)
         except Exception:
-            return False, "Problem interacting with llm"
+            return False, "Problem interacting with llm", []
+
+    async def request_question_async(self, game_state: GameState) -> Tuple[bool, str, List[str]]:
+        """Asynchronous version of request_question"""
+        try:
+            prompt, role = self._build_prompt(game_state)
+            response = await self.llm.generate_response_async(prompt, agent=self.name, role=role)
+            return self._accept_response(response, game_state)
+
+        except Exception as exception:
+            print(f"Agent {self.name} encountered error: {str(exception)}")
+            return False, f"Error generating question: {str(exception)}", []
+
+    def generate_question(self, game_state: GameState) -> Tuple[bool, str]:
+        """Generate next question based on game history with validation.
+
+        The local strategy's proposal, then pooled candidates from an earlier call, are used
+        before asking the LLM again; the spare candidates of the LLM's response are pooled.
+        """
+        local_question = self.local_question(game_state)
+        if local_question is not None:
+            return True, local_question
+
+        is_valid, question, spares = self.request_question(game_state)
+        game_state.candidate_questions.extend(spares)
+        return is_valid, question
+
+    async def generate_question_async(self, game_state: GameState) -> Tuple[bool, str]:
+        """Asynchronous version of generate_question"""
+        local_question = self.local_question(game_state)
+        if local_question is not None:
+            return True, local_question
+
+        is_valid, question, spares = await self.request_question_async(game_state)
+        game_state.candidate_questions.extend(spares)
+        return is_valid, question
 
 
 class MultipleGuesserAgent(GuesserAgent):
@@ -113,17 +350,9 @@ class MultipleGuesserAgent(GuesserAgent):
         """
         self.thinking_time = random.uniform(0.5, 2.0)
 
-    async def generate_question_async(self, game_state: GameState) -> Tuple[bool, str]:
+    async def request_question_async(self, game_state: GameState) -> Tuple[bool, str, List[str]]:
         """
-        Generate question for each async agent
+        Generate question for each async agent without blocking the other agents
         """
-        try:
-            self.reset_thinking_time()
-            is_valid, question = self.generate_question(game_state)
-
-            if is_valid:
-                return is_valid, question
-
-        except Exception as exception:
-            print(f"Agent {self.name} encountered error: {str(exception)}")
-            return False, f"Error generating question: {str(exception)}"
+        self.reset_thinking_time()
+        return await super().request_question_async(game_state)
@@ -0,0 +1,203 @@
+"""Benchmark suite measuring turn latency and throughput of the game managers per game mode.
+
+Games run against the offline SimulatedBackend, so results depend only on the engine and the
+configured latency. Run from the repository root, e.g.:
+    python -m benchmarks.game_modes --num-agents 1,3,5 --max-questions 20 --concurrency 1,8 --output bench.json
+
+A `--num-agents` value of 0 selects the single agent mode; other values select the multiple
+agent mode with that many guessers. Games of a configuration run concurrently on one event
+loop through run_game_async. Latency and throughput come from an untraced pass; peak memory
+is measured with tracemalloc in a separate pass over one wave of concurrent games.
+"""
+# pylint: disable-msg=C0301,R0914
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from typing import List, Optional
+
+from game_manager import BaseGameManager
+from llm import LLMInterface, RequestScheduler
+from main import build_game_manager, run_game_async
+from simulated_llm import SimulatedBackend
+from tracing import percentile
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(value) for value in text.split(",") if value]
+
+
+async def _play_games(config: dict, llm: LLMInterface, games: int, concurrency: int) -> List[BaseGameManager]:
+    """Play `games` games on the running event loop with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def play(_game_index: int) -> BaseGameManager:
+        async with semaphore:
+            game_manager = build_game_manager(config, llm)
+            await run_game_async(game_manager)
+            return game_manager
+
+    return await asyncio.gather(*(play(game_index) for game_index in range(games)))
+
+
+def _turn_latencies(game_manager: BaseGameManager) -> List[float]:
+    """Wall time of each turn played, summed over the turn's top level spans."""
+    turns = {}
+    for span in game_manager.game_state.trace.spans:
+        if span.turn is not None:
+            turns[span.turn] = turns.get(span.turn, 0.0) + span.duration
+    return list(turns.values())
+
+
+def run_case(
+    num_agents: int,
+    max_questions: int,
+    concurrency: int,
+    games: int,
+    latency: float,
+    latency_sigma: float,
+    seed: int,
+    speculation: Optional[str] = None,
+    num_candidates: int = 1,
+    fan_out: str = "all",
+) -> dict:
+    """Play `games` games with one configuration and collect latency, throughput and memory metrics."""
+
+    def make_llm(backend: SimulatedBackend) -> LLMInterface:
+        return LLMInterface(
+            backend=backend, scheduler=RequestScheduler(max_concurrency=max(16, concurrency * 8))
+        )
+
+    backend = SimulatedBackend(latency=latency, latency_sigma=latency_sigma, seed=seed)
+    config = {
+        "game_mode": "single" if num_agents == 0 else "multiple",
+        "num_agents": num_agents,
+        "max_questions": max_questions,
+        "speculation": speculation,
+        "num_candidates": num_candidates,
+        "fan_out": fan_out,
+    }
+    started = time.perf_counter()
+    game_managers = asyncio.run(_play_games(config, make_llm(backend), games, concurrency))
+    wall_time = time.perf_counter() - started
+
+    turn_latencies = [
+        turn_latency for game_manager in game_managers for turn_latency in _turn_latencies(game_manager)
+    ]
+    hedge_totals = {
+        key: sum(getattr(game_manager, "hedge_stats", {}).get(key, 0) for game_manager in game_managers)
+        for key in ("hedges_fired", "hedges_won")
+    }
+    questions = [game_manager.game_state.questions_asked for game_manager in game_managers]
+
+    # tracemalloc slows every allocation down, so memory gets a pass of its own
+    memory_backend = SimulatedBackend(latency=latency, latency_sigma=latency_sigma, seed=seed)
+    tracemalloc.start()
+    asyncio.run(_play_games(config, make_llm(memory_backend), min(games, concurrency), concurrency))
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "game_mode": config["game_mode"],
+        "speculation": speculation,
+        "num_candidates": num_candidates,
+        "fan_out": fan_out,
+        "num_agents": num_agents,
+        "max_questions": max_questions,
+        "concurrency": concurrency,
+        "games": games,
+        "turns": len(turn_latencies),
+        "turn_latency_p50_ms": percentile(turn_latencies, 0.50) * 1000,
+        "turn_latency_p95_ms": percentile(turn_latencies, 0.95) * 1000,
+        "turn_latency_p99_ms": percentile(turn_latencies, 0.99) * 1000,
+        "games_per_second": games / wall_time if wall_time else 0.0,
+        "llm_calls_per_game": backend.calls / games,
+        "cancelled_calls_per_game": backend.cancelled / games,
+        "prompt_cache_read_ratio": backend.cache_read_tokens
+        / max(1, backend.input_tokens + backend.cache_read_tokens + backend.cache_write_tokens),
+        "questions_per_game": sum(questions) / games,
+        "hedges_fired_per_game": hedge_totals["hedges_fired"] / games,
+        "hedges_won_per_game": hedge_totals["hedges_won"] / games,
+        "peak_memory_kib": peak_memory / 1024,
+        "wall_time_seconds": wall_time,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    """Sweep the configured parameter grid and print/write the results."""
+    parser = argparse.ArgumentParser(description="Benchmark game managers against a simulated LLM")
+    parser.add_argument(
+        "--num-agents", type=_int_list, default=[0, 3, 5], help="comma separated, 0 = single mode"
+    )
+    parser.add_argument("--max-questions", type=_int_list, default=[20], help="comma separated")
+    parser.add_argument(
+        "--concurrency", type=_int_list, default=[1, 8], help="comma separated games in flight"
+    )
+    parser.add_argument("--games", type=int, default=20, help="games per configuration")
+    parser.add_argument("--latency", type=float, default=0.02, help="mean simulated LLM latency in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="lognormal latency shape")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--speculation", choices=("both", "likely"), default=None, help="speculative prefetch mode"
+    )
+    parser.add_argument("--num-candidates", type=int, default=1, help="ranked questions per guesser call")
+    parser.add_argument(
+        "--fan-out", choices=("all", "adaptive"), default="all", help="multiple agent fan-out mode"
+    )
+    parser.add_argument("--output", default=None, help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = []
+    for num_agents, max_questions, concurrency in itertools.product(
+        args.num_agents, args.max_questions, args.concurrency
+    ):
+        # The game managers print every turn; keep the benchmark output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run_case(
+                num_agents,
+                max_questions,
+                concurrency,
+                args.games,
+                args.latency,
+                args.latency_sigma,
+                args.seed,
+                args.speculation,
+                args.num_candidates,
+                args.fan_out,
+            )
+        results.append(result)
+        print(
+            f"{result['game_mode']:>8} spec={str(args.speculation):<6} agents={num_agents:<2} max_q={max_questions:<3} conc={concurrency:<3} "
+            f"p50={result['turn_latency_p50_ms']:7.1f}ms p95={result['turn_latency_p95_ms']:7.1f}ms "
+            f"p99={result['turn_latency_p99_ms']:7.1f}ms games/s={result['games_per_second']:7.2f} "
+            f"calls/game={result['llm_calls_per_game']:5.1f} hedges={result['hedges_fired_per_game']:4.1f} cache={result['prompt_cache_read_ratio']:4.0%} peak={result['peak_memory_kib']:8.1f}KiB"
+        )
+
+    if args.output:
+        report = {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "parameters": vars(args),
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
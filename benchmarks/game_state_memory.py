@@ -0,0 +1,53 @@
+"""Benchmark showing GameState memory stays flat across many sequential games.
+
+Run from the repository root:
+    python -m benchmarks.game_state_memory --games 10000
+"""
+# pylint: disable-msg=C0301
+import argparse
+import tracemalloc
+
+from game_state import GameState, LogType
+
+
+def play_fake_game(questions: int) -> GameState:
+    """Fill a game state the way a full game would, without any LLM calls."""
+    game_state = GameState(topic="Quantum supercomputer")
+    for index in range(questions):
+        question = f"Is it question number {index}?"
+        game_state.add_error_log(LogType.VALIDATION_ERROR, "invalid question", question=question)
+        game_state.add_turn(question, index % 3 == 0)
+    game_state.game_over = True
+    game_state.winner = "host"
+    return game_state
+
+
+def main():
+    """Play sequential fake games and report traced memory at regular checkpoints."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--checkpoints", type=int, default=10)
+    args = parser.parse_args()
+
+    interval = max(1, args.games // args.checkpoints)
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    samples = []
+
+    for game_index in range(1, args.games + 1):
+        play_fake_game(args.questions)
+        if game_index % interval == 0:
+            current, _ = tracemalloc.get_traced_memory()
+            samples.append((game_index, current - baseline))
+            print(f"after {game_index:>6} games: {(current - baseline) / 1024:8.1f} KiB traced")
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    growth = samples[-1][1] - samples[0][1]
+    print(f"peak: {(peak - baseline) / 1024:.1f} KiB, growth first->last checkpoint: {growth / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
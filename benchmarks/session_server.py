@@ -0,0 +1,168 @@
+"""Load test for the game session server.
+
+Starts a SessionServer in-process on a free port with the offline SimulatedBackend and drives
+it over HTTP with many concurrent clients, each playing whole games (create, turns, delete) on
+one keep-alive connection. Run from the repository root, e.g.:
+    python -m benchmarks.session_server --clients 200 --games 1000 --num-agents 0
+"""
+# pylint: disable-msg=C0301,R0913,R0914
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import time
+from typing import List, Optional, Tuple
+
+from llm import LLMInterface, RequestScheduler
+from server import SessionServer
+from simulated_llm import SimulatedBackend
+from tracing import percentile
+
+
+class _Client:
+    """Minimal HTTP/1.1 JSON client over one keep-alive connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> "_Client":
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def request(self, method: str, path: str, body: Optional[dict] = None) -> Tuple[int, dict]:
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload
+        )
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def run_load(
+    clients: int,
+    games: int,
+    num_agents: int,
+    max_questions: int,
+    latency: float,
+    latency_sigma: float,
+    seed: int,
+) -> dict:
+    """Play `games` games through the server with `clients` concurrent connections."""
+    backend = SimulatedBackend(latency=latency, latency_sigma=latency_sigma, seed=seed)
+    llm = LLMInterface(backend=backend, scheduler=RequestScheduler(max_concurrency=max(16, clients * 8)))
+    config = {
+        "game_mode": "single" if num_agents == 0 else "multiple",
+        "num_agents": num_agents,
+        "max_questions": max_questions,
+    }
+    server = SessionServer(config, llm=llm)
+    port = await server.start("127.0.0.1", 0)
+
+    remaining = iter(range(games))
+    request_latencies: List[float] = []
+    errors = 0
+
+    async def timed(client: _Client, method: str, path: str) -> dict:
+        nonlocal errors
+        started = time.perf_counter()
+        status, response = await client.request(method, path, {} if method == "POST" else None)
+        request_latencies.append(time.perf_counter() - started)
+        if status >= 400:
+            errors += 1
+        return response
+
+    async def play(_client_index: int):
+        client = await _Client.connect("127.0.0.1", port)
+        try:
+            for _ in remaining:
+                session = await timed(client, "POST", "/sessions")
+                if "session_id" not in session:
+                    continue
+                state = session
+                while not state.get("game_over", True):
+                    state = await timed(client, "POST", f"/sessions/{session['session_id']}/turn")
+                await timed(client, "DELETE", f"/sessions/{session['session_id']}")
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(play(client_index) for client_index in range(clients)))
+    wall_time = time.perf_counter() - started
+    metrics = server.metrics()
+    await server.close()
+
+    return {
+        "game_mode": config["game_mode"],
+        "num_agents": num_agents,
+        "clients": clients,
+        "games": metrics["games_finished"],
+        "turns": metrics["turns"],
+        "requests": len(request_latencies),
+        "errors": errors,
+        "wall_time_seconds": wall_time,
+        "games_per_second": metrics["games_finished"] / wall_time if wall_time else 0.0,
+        "requests_per_second": len(request_latencies) / wall_time if wall_time else 0.0,
+        "request_latency_p50_ms": percentile(request_latencies, 0.50) * 1000,
+        "request_latency_p95_ms": percentile(request_latencies, 0.95) * 1000,
+        "request_latency_p99_ms": percentile(request_latencies, 0.99) * 1000,
+        "turn_latency_p50_ms": metrics["turn_latency_p50_ms"],
+        "turn_latency_p99_ms": metrics["turn_latency_p99_ms"],
+        "llm_calls": backend.calls,
+    }
+
+
+def main():
+    """Command line entry point for the session server load test."""
+    parser = argparse.ArgumentParser(description="Load test the game session server")
+    parser.add_argument("--clients", type=int, default=50, help="concurrent client connections")
+    parser.add_argument("--games", type=int, default=200, help="games to play in total")
+    parser.add_argument("--num-agents", type=int, default=0, help="0 = single mode")
+    parser.add_argument("--max-questions", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="mean simulated LLM latency in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="lognormal latency shape")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="write the result as JSON to this path")
+    args = parser.parse_args()
+
+    # The game managers print every turn; keep the load test output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = asyncio.run(
+            run_load(
+                args.clients,
+                args.games,
+                args.num_agents,
+                args.max_questions,
+                args.latency,
+                args.latency_sigma,
+                args.seed,
+            )
+        )
+    print(
+        f"{result['game_mode']:>8} agents={result['num_agents']:<2} clients={result['clients']:<4} "
+        f"games={result['games']} errors={result['errors']} games/s={result['games_per_second']:.1f} "
+        f"req/s={result['requests_per_second']:.0f} p50={result['request_latency_p50_ms']:.1f}ms "
+        f"p95={result['request_latency_p95_ms']:.1f}ms p99={result['request_latency_p99_ms']:.1f}ms"
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump({"parameters": vars(args), "result": result}, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Microbenchmark comparing looped per-pattern regex validation with the precompiled validator.
+
+Run from the repository root:
+    python -m benchmarks.validator_throughput --questions 200000
+"""
+# pylint: disable-msg=C0301
+import argparse
+import random
+import re
+import time
+from typing import Callable, List, Optional
+
+from validator import DIRECT_GUESS_PATTERNS, INVALID_PATTERNS, QuestionValidator
+
+_STARTS = (
+    "is it",
+    "does it",
+    "can you",
+    "what is",
+    "how does",
+    "who made",
+    "could it be",
+    "tell me",
+    "are you thinking of",
+)
+_WORDS = (
+    "a",
+    "machine",
+    "larger",
+    "than",
+    "person",
+    "used",
+    "for",
+    "science",
+    "the",
+    "quantum",
+    "computer",
+    "alive",
+)
+
+
+def build_corpus(size: int, seed: int = 0) -> List[str]:
+    """Generate a reproducible mix of valid questions, invalid questions and direct guesses."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 8)))
+        corpus.append(f"{rng.choice(_STARTS).capitalize()} {words}{rng.choice(('?', '', '?!'))}")
+    return corpus
+
+
+def legacy_invalid_pattern(question: str) -> Optional[str]:
+    """The previous implementation: one re.search per pattern in a Python loop."""
+    for pattern in INVALID_PATTERNS:
+        if re.search(pattern, question):
+            return pattern
+    return None
+
+
+def legacy_extract_guess(question: str) -> Optional[str]:
+    """The previous implementation: one re.match per pattern in a Python loop."""
+    question = question.lower().strip()
+    for pattern in DIRECT_GUESS_PATTERNS:
+        match = re.match(pattern, question)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+def _rate(function: Callable[[str], Optional[str]], corpus: List[str]) -> float:
+    started = time.perf_counter()
+    for question in corpus:
+        function(question)
+    return len(corpus) / (time.perf_counter() - started)
+
+
+def main():
+    """Check both implementations agree, then report validations/sec for each."""
+    parser = argparse.ArgumentParser(description="Benchmark question validation throughput")
+    parser.add_argument("--questions", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.questions, args.seed)
+    normalized = [question.lower().strip() for question in corpus]
+    validator = QuestionValidator()
+
+    for question, normalized_question in zip(corpus, normalized):
+        assert legacy_invalid_pattern(normalized_question) == validator.match_invalid_pattern(
+            normalized_question
+        )
+        assert legacy_extract_guess(question) == validator.extract_guess(question)
+
+    for name, legacy, compiled, inputs in (
+        ("invalid pattern check", legacy_invalid_pattern, validator.match_invalid_pattern, normalized),
+        ("direct guess extraction", legacy_extract_guess, validator.extract_guess, corpus),
+    ):
+        before = _rate(legacy, inputs)
+        after = _rate(compiled, inputs)
+        print(
+            f"{name:<24} before: {before:>12,.0f}/s  after: {after:>12,.0f}/s  speedup: {after / before:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
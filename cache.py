@@ -0,0 +1,178 @@
+"""Module containing the host answer cache shared across games."""
+# pylint: disable-msg=C0301
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from text import normalize_question
+
+
+class AnswerCache:
+    """LRU cache of host answers keyed on (topic, normalized question).
+
+    When a path is given, answers are also written to a SQLite table so the cache survives
+    restarts; entries evicted from memory are re-read from disk on demand. Writes are committed
+    in batches, since the cache is used from the event loop shared by every game, and a commit
+    per answer would block all of them on disk syncs. A batch is committed after `commit_every`
+    answers or `commit_interval` seconds, whichever comes first, so the write lock is not held
+    for long; call flush (e.g. after each game) or close to commit the rest. The database is a
+    best effort copy: when it is locked, writes are dropped and counted rather than waited for.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 4096,
+        path: Optional[str] = None,
+        commit_every: int = 64,
+        commit_interval: float = 1.0,
+        lock_timeout: float = 0.05,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of answers kept in memory
+            path: Optional SQLite database path for persistence
+            commit_every: Maximum number of answers written to SQLite per commit
+            commit_interval: Maximum seconds an answer stays uncommitted, checked on each write
+            lock_timeout: Seconds to wait for a database locked by another connection
+        """
+        self.max_size = max_size
+        self.path = path
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.hits = 0
+        self.misses = 0
+        self.write_errors = 0
+        self._entries: "OrderedDict[Tuple[str, str], bool]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._uncommitted = 0
+        self._batch_started = 0.0
+        if path:
+            self._connection = sqlite3.connect(path, timeout=lock_timeout, check_same_thread=False)
+            # With WAL, commits at NORMAL synchronous level do not wait for a disk sync
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS host_answers ("
+                "topic TEXT NOT NULL, question TEXT NOT NULL, answer INTEGER NOT NULL, "
+                "PRIMARY KEY (topic, question))"
+            )
+            self._connection.commit()
+
+    @staticmethod
+    def make_key(topic: str, question: str) -> Tuple[str, str]:
+        """Build the cache key for a topic and question."""
+        return topic.lower().strip(), normalize_question(question)
+
+    def get(self, topic: str, question: str) -> Optional[bool]:
+        """Look up a cached answer.
+
+        Args:
+            topic: The secret topic
+            question: The question asked
+
+        Returns:
+            The cached answer, or None on a miss
+        """
+        key = self.make_key(topic, question)
+        with self._lock:
+            answer = self._entries.get(key)
+            if answer is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return answer
+
+            if self._connection is not None:
+                try:
+                    row = self._connection.execute(
+                        "SELECT answer FROM host_answers WHERE topic = ? AND question = ?", key
+                    ).fetchone()
+                except sqlite3.OperationalError:
+                    row = None
+                if row is not None:
+                    answer = bool(row[0])
+                    self._store(key, answer)
+                    self.hits += 1
+                    return answer
+
+            self.misses += 1
+            return None
+
+    def put(self, topic: str, question: str, answer: bool):
+        """Store an answer in memory and, when persistent, on disk.
+
+        Args:
+            topic: The secret topic
+            question: The question asked
+            answer: The host's answer
+        """
+        key = self.make_key(topic, question)
+        with self._lock:
+            self._store(key, answer)
+            if self._connection is None:
+                return
+            try:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO host_answers (topic, question, answer) VALUES (?, ?, ?)",
+                    (*key, int(answer)),
+                )
+            except sqlite3.OperationalError:
+                # Locked by another connection; the answer is still cached in memory
+                self.write_errors += 1
+                return
+            if not self._uncommitted:
+                self._batch_started = time.monotonic()
+            self._uncommitted += 1
+            if (
+                self._uncommitted >= self.commit_every
+                or time.monotonic() - self._batch_started >= self.commit_interval
+            ):
+                self._commit()
+
+    def flush(self):
+        """Commit the answers written to SQLite since the last commit."""
+        with self._lock:
+            if self._connection is not None:
+                self._commit()
+
+    def _commit(self):
+        if not self._uncommitted:
+            return
+        try:
+            self._connection.commit()
+        except sqlite3.OperationalError:
+            self._connection.rollback()
+            self.write_errors += self._uncommitted
+        self._uncommitted = 0
+
+    def _store(self, key: Tuple[str, str], answer: bool):
+        """Insert into the in-memory LRU, evicting the least recently used entry if full."""
+        self._entries[key] = answer
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current in-memory size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "write_errors": self.write_errors,
+        }
+
+    def close(self):
+        """Commit pending answers and close the underlying SQLite connection, if any."""
+        with self._lock:
+            if self._connection is not None:
+                self._commit()
+                self._connection.close()
+                self._connection = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
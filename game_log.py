@@ -0,0 +1,103 @@
+"""Module containing the append-only JSON Lines game log writer and reader."""
+# pylint: disable-msg=C0301
+import json
+import os
+import threading
+import time
+from typing import Iterator, List, Optional
+
+
+class JsonlLogWriter:
+    """Buffered, thread-safe writer appending one JSON record per line to a log file.
+
+    Records are buffered in memory and appended to the file once `flush_every` records are
+    pending or `flush_interval` seconds have passed since the last flush, so a crashed
+    process loses at most the last few records instead of the whole game. The file is only
+    ever appended to, so several games (or runs) can share it; each record carries a game id.
+    """
+
+    def __init__(self, path: str, flush_every: int = 64, flush_interval: float = 1.0):
+        """Initialize the writer.
+
+        Args:
+            path: Path of the JSON Lines file, created (with its directory) when missing
+            flush_every: Pending records that trigger a flush
+            flush_interval: Seconds after which pending records are flushed on the next write
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.records_written = 0
+        self._pending: List[str] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")  # pylint: disable=consider-using-with
+
+    def write(self, record: dict):
+        """Queue one record, flushing when the buffer is full or the flush interval elapsed.
+
+        Args:
+            record: JSON serialisable record
+        """
+        line = json.dumps(record, separators=(",", ":"), default=str)
+        with self._lock:
+            self._pending.append(line)
+            if (
+                len(self._pending) >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            ):
+                self._flush_locked()
+
+    def flush(self):
+        """Append all pending records to the file."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self._pending and not self._file.closed:
+            self._file.write("\n".join(self._pending) + "\n")
+            self._file.flush()
+            self.records_written += len(self._pending)
+            self._pending.clear()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """Flush pending records and close the file."""
+        with self._lock:
+            self._flush_locked()
+            self._file.close()
+
+    def __enter__(self) -> "JsonlLogWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_jsonl(path: str, game_id: Optional[str] = None) -> Iterator[dict]:
+    """Stream the records of a JSON Lines file one line at a time.
+
+    A truncated last line, left by a process killed mid-write, is skipped.
+
+    Args:
+        path: Path of the JSON Lines file
+        game_id: Only yield records of this game, when given
+
+    Yields:
+        dict: One record per line
+    """
+    with open(path, encoding="utf-8") as log_file:
+        for line in log_file:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                if line.endswith("\n"):
+                    raise
+                return
+            if game_id is None or record.get("game_id") == game_id:
+                yield record
@@ -2,29 +2,108 @@
 # pylint: disable-msg=C0301,R0903,W0718,W0511
 # TODO: Catching too general exception
 import asyncio
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple
+from collections import deque
+from typing import Awaitable, List, Optional, Tuple, TypeVar
 
 from agent import GameState, GuesserAgent, HostAgent, MultipleGuesserAgent
+from game_log import JsonlLogWriter
+from tracing import percentile
+
+SPECULATION_MODES = (None, "both", "likely")
+
+FAN_OUT_MODES = ("all", "adaptive")
+
+T = TypeVar("T")
+
+_thread_state = threading.local()
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """Run an awaitable to completion on the calling thread's persistent event loop.
+
+    The loop is created on first use and reused by every later call from the same thread, so
+    async clients and connection pools bound to it survive across turns and games, unlike
+    with asyncio.run.
+
+    Args:
+        awaitable: Coroutine to run
+
+    Returns:
+        The coroutine's result
+
+    Raises:
+        RuntimeError: When called from a running event loop, where the async API must be used
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError("run_sync cannot be called from a running event loop, await the async API instead")
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _thread_state.loop = loop
+    return loop.run_until_complete(awaitable)
 
 
 class BaseGameManager(ABC):
     """Base game manager to manager the game flow between host and guesser agents."""
 
-    def __init__(self, host: HostAgent, max_questions: int = 20):
+    def __init__(
+        self,
+        host: HostAgent,
+        max_questions: int = 20,
+        speculation: Optional[str] = None,
+        log_writer: Optional[JsonlLogWriter] = None,
+        checkpoint_path: Optional[str] = None,
+    ):
+        """Initialize the game manager.
+
+        Args:
+            host: The host agent
+            max_questions: Maximum number of questions per game
+            speculation: Speculative prefetch of the next question while the host answers:
+                None to disable, "both" for the yes and no branches, "likely" for the likely one
+            log_writer: Optional JSON Lines game log receiving each game's events as they happen
+            checkpoint_path: Optional file the game state is checkpointed to after every turn,
+                so an interrupted game can be continued with resume_game
+        """
+        if speculation not in SPECULATION_MODES:
+            raise ValueError(f"Unknown speculation mode {speculation!r}, expected one of {SPECULATION_MODES}")
         self.host = host
         self.max_questions = max_questions
         self.game_state = GameState()
+        self.speculation = speculation
+        self.log_writer = log_writer
+        self.checkpoint_path = checkpoint_path
+        self.speculation_stats = {"launched": 0, "committed": 0, "wasted": 0}
+        self._prefetched_question: Optional[str] = None
 
     @abstractmethod
     def setup_agent(self):
         """Abstract class for setting up guesser agent"""
 
+    def get_question(self) -> Tuple[bool, str]:
+        """Synchronous wrapper getting the next valid question for the current game state"""
+        return run_sync(self.generate_question_for(self.game_state))
+
     @abstractmethod
-    def get_question(self):
-        """Abstract class for getting next valid question"""
+    async def generate_question_for(self, game_state: GameState) -> Tuple[bool, str]:
+        """Abstract class for asynchronously getting a valid question for the given (possibly branched) state"""
 
     def start_game(self) -> GameState:
+        """Synchronous wrapper for start_game_async, run on the thread's persistent event loop.
+
+        Returns:
+            GameState: The initial game state
+        """
+        return run_sync(self.start_game_async())
+
+    async def start_game_async(self) -> GameState:
         """Initialize a new game.
 
         Returns:
@@ -37,10 +116,34 @@ class BaseGameManager(ABC):
         print("If the guesser correctly guesses the topic, they win!")
         print("The guesser has up to 20 total questions and guesses to win")
         print("\n")
-        self.game_state = GameState()
+        self.game_state = GameState(log_writer=self.log_writer)
         self.game_state.topic = self.host.choose_topic()
+        self.game_state.log_event("game_start", topic=self.game_state.topic, max_questions=self.max_questions)
+        self._prefetched_question = None
+        self._save_checkpoint()
+        return self.game_state
+
+    def resume_game(self, checkpoint_path: Optional[str] = None) -> GameState:
+        """Continue a game from a checkpoint instead of starting a new one.
+
+        The history is re-hydrated from the checkpoint, so no LLM call is repeated for the
+        turns already played.
+
+        Args:
+            checkpoint_path: Checkpoint to resume from, defaults to the manager's checkpoint_path
+
+        Returns:
+            GameState: The restored game state
+        """
+        self.game_state = GameState.load_checkpoint(checkpoint_path or self.checkpoint_path, self.log_writer)
+        self.game_state.log_event("game_resume", questions_asked=self.game_state.questions_asked)
+        self._prefetched_question = None
         return self.game_state
 
+    def _save_checkpoint(self):
+        if self.checkpoint_path:
+            self.game_state.save_checkpoint(self.checkpoint_path)
+
     @abstractmethod
     def check_direct_guess(self, question: str) -> Optional[str]:
         """Check for direct guess"""
@@ -49,14 +152,30 @@ class BaseGameManager(ABC):
     def play_turn(
         self,
     ) -> Tuple[GameState, str]:
-        """Play one turn of the game.
+        """Synchronous wrapper for play_turn_async, run on the thread's persistent event loop.
+
+        Returns:
+            Tuple[GameState, str]: Updated game state and turn result message
+        """
+        return run_sync(self.play_turn_async())
+
+    async def play_turn_async(
+        self,
+    ) -> Tuple[GameState, str]:
+        """Play one turn of the game, checkpointing the state afterwards when configured.
 
         Returns:
             Tuple[GameState, str]: Updated game state and turn result message
         """
+        result = await self._play_turn()
+        self._save_checkpoint()
+        return result
+
+    async def _play_turn(
+        self,
+    ) -> Tuple[GameState, str]:
         if self.game_state.questions_asked >= self.max_questions:
-            self.game_state.game_over = True
-            self.game_state.winner = "host"
+            self.game_state.end_game("host")
             return self.game_state, "Game Over - Host wins! Question number is over limit (20)."
 
         # # Get question from guesser
@@ -65,48 +184,155 @@ class BaseGameManager(ABC):
         # while not is_question_valid:
         #     is_question_valid, msg = self.guesser.generate_question(self.game_state)
         # question = msg
-        _, question = self.get_question()
+        turn = self.game_state.questions_asked + 1
+        with self.game_state.trace.span("question_generation", turn=turn):
+            if self._prefetched_question is not None:
+                is_valid, question = True, self._prefetched_question
+                self._prefetched_question = None
+                self.speculation_stats["committed"] += 1
+            else:
+                is_valid, question = await self.generate_question_for(self.game_state)
+
+        if not is_valid:
+            # The guesser could not come up with a valid question, so the turn is forfeited
+            self.game_state.add_forfeit(question)
+            return self.game_state, f"Turn forfeited - no valid question: {question}"
         print(f"Guesser now making a new question: {question}")
 
         # Check if it's a direct guess
         direct_guess = self.check_direct_guess(question)
 
         # Get answer from host
-        answer = self.host.answer_question(question, self.game_state.topic)
+        with self.game_state.trace.span("host_answer", turn=turn):
+            if self.speculation and turn < self.max_questions:
+                answer = await self._answer_and_prefetch(question)
+            else:
+                answer = await self.host.answer_question_async(question, self.game_state.topic)
         print(f"Host anwsered this question: {answer}")
 
         # Update game state
-        self.game_state.questions_asked += 1
-        self.game_state.previous_questions.append(question)
-        self.game_state.previous_answers.append(answer)
+        self.game_state.add_turn(question, answer)
 
         # If it's a direct guess and correct, guesser wins and stop the game
         if direct_guess and answer and direct_guess.lower() == self.game_state.topic.lower():
-            self.game_state.game_over = True
-            self.game_state.winner = "guesser"
+            self.game_state.end_game("guesser")
+            if self._prefetched_question is not None:
+                # The game ended before the next turn could use the prefetched question
+                self._prefetched_question = None
+                self.speculation_stats["wasted"] += 1
             return self.game_state, f"Game Over - Guesser wins! The topic was {self.game_state.topic}"
 
         return (self.game_state, f"Q: {question}\nA: {'Yes' if answer else 'No'}")
 
+    def _likely_answer(self) -> bool:
+        """Predict the host's answer from the answers given so far."""
+        answers = self.game_state.previous_answers
+        return sum(answers) * 2 > len(answers)
+
+    async def _speculate(self, branch_state: GameState, branch_answer: bool) -> Tuple[bool, str]:
+        """Generate the next question on a speculative branch, in its own span.
+
+        Branch tasks are started while the host_answer span is current; the dedicated span keeps
+        their guesser calls from being attributed to the host's answer.
+        """
+        with branch_state.trace.span(
+            "speculative_question_generation", turn=branch_state.questions_asked + 1, branch=branch_answer
+        ):
+            return await self.generate_question_for(branch_state)
+
+    async def _answer_and_prefetch(self, question: str) -> bool:
+        """Get the host's answer while speculatively generating the next question.
+
+        The next question is generated on branched game states for the speculated answer(s).
+        Once the host answers, the other branch is cancelled in flight and the matching
+        branch's question is kept for the next turn. It only counts as committed once that
+        turn asks it; a question left over when the game ends counts as wasted.
+
+        Args:
+            question: The question the host is answering
+
+        Returns:
+            bool: The host's answer
+        """
+        host_task = asyncio.create_task(self.host.answer_question_async(question, self.game_state.topic))
+        branch_answers = (True, False) if self.speculation == "both" else (self._likely_answer(),)
+        branches = {}
+        for branch_answer in branch_answers:
+            branch_state = self.game_state.branch(question, branch_answer)
+            branches[branch_answer] = (
+                branch_state,
+                len(branch_state.error_logs),
+                asyncio.create_task(self._speculate(branch_state, branch_answer)),
+            )
+        self.speculation_stats["launched"] += len(branches)
+
+        try:
+            answer = await host_task
+        except BaseException:
+            for _, _, task in branches.values():
+                task.cancel()
+            await asyncio.gather(*(task for _, _, task in branches.values()), return_exceptions=True)
+            raise
+
+        losers = [task for branch_answer, (_, _, task) in branches.items() if branch_answer != answer]
+        for task in losers:
+            task.cancel()
+        self.speculation_stats["wasted"] += len(losers)
+        await asyncio.gather(*losers, return_exceptions=True)
+
+        if answer in branches:
+            branch_state, logs_before, task = branches[answer]
+            is_valid, next_question = await task
+            # Validation errors hit while prefetching belong to the real game
+            self.game_state.extend_logs(branch_state.error_logs[logs_before:])
+            if is_valid:
+                self._prefetched_question = next_question
+                self.game_state.candidate_questions = branch_state.candidate_questions
+            else:
+                self.speculation_stats["wasted"] += 1
+        return answer
+
 
 class SingleGameManager(BaseGameManager):
     """
     Game manager managing the game flow with single agent
     """
 
-    def __init__(self, host: HostAgent, guesser: GuesserAgent, max_questions: int = 20):
-        super().__init__(host, max_questions)
+    def __init__(
+        self,
+        host: HostAgent,
+        guesser: GuesserAgent,
+        max_questions: int = 20,
+        speculation: Optional[str] = None,
+        max_attempts: int = 5,
+        log_writer: Optional[JsonlLogWriter] = None,
+        checkpoint_path: Optional[str] = None,
+    ):
+        """Initialize the single agent game manager.
+
+        Args:
+            host: The host agent
+            guesser: The guesser agent
+            max_questions: Maximum number of questions per game
+            speculation: Speculative prefetch mode, see BaseGameManager
+            max_attempts: Attempts at producing a valid question before the turn is forfeited
+            log_writer: Optional JSON Lines game log, see BaseGameManager
+            checkpoint_path: Optional per-turn checkpoint file, see BaseGameManager
+        """
+        super().__init__(host, max_questions, speculation, log_writer, checkpoint_path)
         self.guesser = guesser
+        self.max_attempts = max_attempts
 
     def setup_agent(self):
         pass
 
-    def get_question(self) -> Tuple[bool, str]:
-        is_valid, msg = self.guesser.generate_question(self.game_state)
-        while not is_valid:
-            is_valid, msg = self.guesser.generate_question(self.game_state)
-        question = msg
-        return True, question
+    async def generate_question_for(self, game_state: GameState) -> Tuple[bool, str]:
+        is_valid, msg = False, "No attempts made"
+        for _ in range(self.max_attempts):
+            is_valid, msg = await self.guesser.generate_question_async(game_state)
+            if is_valid:
+                break
+        return is_valid, msg
 
     def check_direct_guess(self, question: str) -> Optional[str]:
         return self.guesser.validator.extract_guess(question)
@@ -117,20 +343,148 @@ class MultipleAgentGameManager(BaseGameManager):
     Game manager managing the game flow with multiple sub agents
     """
 
-    def __init__(self, host: HostAgent, guessers: List[MultipleGuesserAgent], max_questions: int = 20):
-        super().__init__(host, max_questions)
+    def __init__(
+        self,
+        host: HostAgent,
+        guessers: List[MultipleGuesserAgent],
+        max_questions: int = 20,
+        speculation: Optional[str] = None,
+        log_writer: Optional[JsonlLogWriter] = None,
+        checkpoint_path: Optional[str] = None,
+        fan_out: str = "all",
+        hedge_percentile: float = 0.9,
+        hedge_budget: Optional[int] = None,
+        initial_hedge_delay: float = 1.0,
+        latency_window: int = 50,
+    ):
+        """Initialize the multiple agent game manager.
+
+        Args:
+            host: The host agent
+            guessers: The competing guesser agents
+            max_questions: Maximum number of questions per game
+            speculation: Speculative prefetch mode, see BaseGameManager
+            log_writer: Optional JSON Lines game log, see BaseGameManager
+            checkpoint_path: Optional per-turn checkpoint file, see BaseGameManager
+            fan_out: "all" races every guesser on each turn; "adaptive" starts one guesser and
+                only launches hedge requests when it is slower than usual or fails
+            hedge_percentile: Percentile of recent request latencies after which a hedge fires
+            hedge_budget: Maximum hedge requests per question, defaults to one per extra guesser
+            initial_hedge_delay: Hedge delay in seconds until enough latencies are recorded
+            latency_window: Number of recent request latencies the percentile is computed over
+        """
+        super().__init__(host, max_questions, speculation, log_writer, checkpoint_path)
+        if not guessers:
+            raise ValueError("At least one guesser is required")
+        if fan_out not in FAN_OUT_MODES:
+            raise ValueError(f"Unknown fan-out mode {fan_out!r}, expected one of {FAN_OUT_MODES}")
         self.guessers = guessers
+        self.fan_out = fan_out
+        self.hedge_percentile = hedge_percentile
+        self.hedge_budget = len(guessers) - 1 if hedge_budget is None else hedge_budget
+        self.initial_hedge_delay = initial_hedge_delay
+        self.hedge_stats = {"questions": 0, "requests": 0, "hedges_fired": 0, "hedges_won": 0}
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._next_primary = 0
 
     def setup_agent(self):
         pass
 
-    def get_question(self) -> Tuple[bool, str]:
-        """Synchronous wrapper for async question generation"""
-        return asyncio.run(self._get_question())
+    async def generate_question_for(self, game_state: GameState) -> Tuple[bool, str]:
+        # The strategy and the candidate pool are shared by every guesser, so a local question
+        # is taken once here instead of by each guesser of the race, which would throw away
+        # all but one of them
+        local_question = self.guessers[0].local_question(game_state)
+        if local_question is not None:
+            return True, local_question
+        if self.fan_out == "adaptive":
+            is_valid, question, spares = await self._get_question_hedged(game_state)
+        else:
+            is_valid, question, spares = await self._get_question(game_state)
+        # Only the winning response's spare candidates are pooled
+        game_state.candidate_questions.extend(spares)
+        return is_valid, question
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on outstanding requests before firing a hedge request.
+
+        The configured percentile of recent request latencies, cancelled requests counting
+        with the time they ran, or the initial delay while fewer than five latencies have been
+        recorded.
+        """
+        if len(self._latencies) < 5:
+            return self.initial_hedge_delay
+        return percentile(self._latencies, self.hedge_percentile)
+
+    async def _get_question_hedged(self, game_state: GameState) -> Tuple[bool, str, List[str]]:
+        """Get a valid question from one guesser, hedging with others only when it is slow.
+
+        A hedge request is launched on the next guesser whenever the outstanding requests have
+        run longer than hedge_delay since the last launch, or all of them finished without a
+        valid question, up to hedge_budget hedges. The first valid question wins and the other
+        requests are cancelled.
+        """
+        # Rotate the primary guesser so every agent gets to lead
+        order = self.guessers[self._next_primary :] + self.guessers[: self._next_primary]
+        self._next_primary = (self._next_primary + 1) % len(self.guessers)
+        standby = iter(order[1 : 1 + self.hedge_budget])
+        self.hedge_stats["questions"] += 1
+        tasks = {}
+
+        def launch(agent: MultipleGuesserAgent, is_hedge: bool) -> bool:
+            tasks[asyncio.create_task(agent.request_question_async(game_state))] = (
+                is_hedge,
+                time.perf_counter(),
+            )
+            self.hedge_stats["requests"] += 1
+            self.hedge_stats["hedges_fired"] += is_hedge
+            return True
+
+        def hedge() -> bool:
+            agent = next(standby, None)
+            return agent is not None and launch(agent, True)
+
+        launch(order[0], False)
+        can_hedge = self.hedge_budget > 0
+        try:
+            while tasks:
+                timeout = None
+                if can_hedge:
+                    last_launch = max(started for _, started in tasks.values())
+                    timeout = max(0.0, last_launch + self.hedge_delay() - time.perf_counter())
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    can_hedge = hedge()
+                    continue
+
+                for task in done:
+                    is_hedge, started = tasks.pop(task)
+                    self._latencies.append(time.perf_counter() - started)
+                    is_valid, result, spares = task.result()
+                    if is_valid:
+                        self.hedge_stats["hedges_won"] += is_hedge
+                        return True, result, spares
+                if not tasks and can_hedge:
+                    can_hedge = hedge()
+
+            return False, "No valid question generated", []
 
-    async def _get_question(self) -> Tuple[bool, str]:
-        """Get first valid question from competing agents"""
-        tasks = [agent.generate_question_async(self.game_state) for agent in self.guessers]
+        except Exception as exception:
+            print(f"Error in question generation: {str(exception)}")
+            return False, "Error in question generation", []
+
+        finally:
+            cancelled_at = time.perf_counter()
+            for remaining_task, (_, started) in tasks.items():
+                # Slow requests are the ones that lose; record how long they ran at least so the
+                # percentile is not computed over the fast requests only
+                self._latencies.append(cancelled_at - started)
+                remaining_task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _get_question(self, game_state: GameState) -> Tuple[bool, str, List[str]]:
+        """Get first valid question from competing agents, with its spare candidates"""
+        tasks = {asyncio.create_task(agent.request_question_async(game_state)) for agent in self.guessers}
 
         try:
             # Wait for all tasks to complete or first valid question
@@ -139,21 +493,21 @@ class MultipleAgentGameManager(BaseGameManager):
 
                 # Process completed tasks in order of completion
                 for task in done:
-                    is_valid, result = task.result()
+                    is_valid, result, spares = task.result()
                     if is_valid:
-                        # Once the first one got complete, cancel remaining tasks
-                        for remaining_task in tasks:
-                            remaining_task.cancel()
-                        return True, result
+                        return True, result, spares
 
-                # Update remaining tasks
-                tasks = set(remaining_task for remaining_task in tasks if not remaining_task.done())
-
-            return False, "No valid question generated"
+            return False, "No valid question generated", []
 
         except Exception as exception:
             print(f"Error in question generation: {str(exception)}")
-            return False, "Error in question generation"
+            return False, "Error in question generation", []
+
+        finally:
+            # Cancel the losing requests in flight so they stop consuming tokens and connections
+            for remaining_task in tasks:
+                remaining_task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     def check_direct_guess(self, question: str) -> Optional[str]:
         """Check for direct guess - using first guesser's validator"""
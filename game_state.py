@@ -1,10 +1,16 @@
 """Module containing game state and logging implementations"""
 # pylint: disable-msg=C0301
 import json
+import os
+import uuid
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from game_log import JsonlLogWriter
+from similarity import QuestionIndex
+from tracing import GameTrace
 
 
 class LogType(Enum):
@@ -27,23 +33,219 @@ class GameLog:
     question: Optional[str] = None
     details: Optional[Dict] = None
 
+    def to_dict(self) -> dict:
+        """JSON serialisable form of the entry."""
+        return {
+            "timestamp": self.timestamp,
+            "type": self.log_type.value,
+            "message": self.message,
+            "question": self.question,
+            "details": self.details,
+        }
+
+
+CONTEXT_HEADER = "Previous questions and answers:\n"
+
+CHECKPOINT_VERSION = 1
+
+
+class PackedAnswers:
+    """Append-only sequence of yes/no answers packed one bit per answer into a bytearray."""
+
+    __slots__ = ("_bits", "_length")
+
+    def __init__(self, answers: Optional[Iterable[bool]] = None):
+        self._bits = bytearray()
+        self._length = 0
+        for answer in answers or ():
+            self.append(answer)
+
+    def append(self, answer: bool):
+        """Append one answer to the sequence.
+
+        Args:
+            answer: True for 'yes', False for 'no'
+        """
+        byte_index, bit_index = divmod(self._length, 8)
+        if bit_index == 0:
+            self._bits.append(0)
+        if answer:
+            self._bits[byte_index] |= 1 << bit_index
+        self._length += 1
+
+    def __len__(self) -> int:
+        return self._length
+
+    def copy(self) -> "PackedAnswers":
+        """Independent copy of the sequence."""
+        duplicate = PackedAnswers()
+        duplicate._bits = bytearray(self._bits)
+        duplicate._length = self._length
+        return duplicate
+
+    def __getitem__(self, index: int) -> bool:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("answer index out of range")
+        byte_index, bit_index = divmod(index, 8)
+        return bool(self._bits[byte_index] >> bit_index & 1)
+
+    def __iter__(self) -> Iterator[bool]:
+        for index in range(self._length):
+            yield self[index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PackedAnswers):
+            return self._length == other._length and self._bits == other._bits
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"PackedAnswers({list(self)!r})"
+
+    def to_hex(self) -> str:
+        """Packed bits as a hex string; the length is kept separately."""
+        return self._bits.hex()
+
+    @classmethod
+    def from_hex(cls, bits: str, length: int) -> "PackedAnswers":
+        """Rebuild a sequence from `to_hex` output and its length."""
+        answers = cls()
+        answers._bits = bytearray.fromhex(bits)
+        answers._length = length
+        return answers
+
 
 class GameState:
-    """Class representing the current state of a 20 questions game."""
-
-    questions_asked: int = 0
-    topic: str
-    previous_questions: List[str] = []
-    previous_answers: List[bool] = []
-    game_over: bool = False
-    winner: Optional[str] = None
-    error_logs: List[GameLog] = []
-
-    def __post_init__(self):
-        if self.previous_questions is None:
-            self.previous_questions = []
-        if self.previous_answers is None:
-            self.previous_answers = []
+    """Class representing the current state of a 20 questions game.
+
+    Each instance owns its history; slots keep the per-game footprint small so workers
+    playing many games in one process do not accumulate state. With a log writer, turns,
+    error logs and the outcome are appended to the game log as they happen.
+    """
+
+    __slots__ = (
+        "questions_asked",
+        "topic",
+        "previous_questions",
+        "previous_answers",
+        "game_over",
+        "winner",
+        "error_logs",
+        "trace",
+        "question_index",
+        "candidate_questions",
+        "forfeited_turns",
+        "game_id",
+        "log_writer",
+        "_context",
+    )
+
+    def __init__(
+        self,
+        topic: Optional[str] = None,
+        game_id: Optional[str] = None,
+        log_writer: Optional[JsonlLogWriter] = None,
+    ):
+        self.questions_asked: int = 0
+        self.topic: Optional[str] = topic
+        self.previous_questions: List[str] = []
+        self.previous_answers: PackedAnswers = PackedAnswers()
+        self.game_over: bool = False
+        self.winner: Optional[str] = None
+        self.error_logs: List[GameLog] = []
+        self.trace: GameTrace = GameTrace()
+        self.question_index: QuestionIndex = QuestionIndex()
+        self.candidate_questions: List[str] = []
+        self.forfeited_turns: List[int] = []
+        self.game_id: str = game_id or uuid.uuid4().hex
+        self.log_writer: Optional[JsonlLogWriter] = log_writer
+        self._context: str = CONTEXT_HEADER
+
+    @property
+    def context(self) -> str:
+        """Rendered 'Previous questions and answers' history, shared by all agents of the game."""
+        return self._context
+
+    def add_turn(self, question: str, answer: bool):
+        """Record one asked question and its answer.
+
+        The rendered context is extended by a single line and the question is added to the
+        similarity index, so neither prompt building nor duplicate checks rescan the history.
+
+        Args:
+            question: The question that was asked
+            answer: The host's answer
+        """
+        self.questions_asked += 1
+        self.previous_questions.append(question)
+        self.previous_answers.append(answer)
+        self.question_index.add(question)
+        self._context += f"Q: {question}\nA: {'Yes' if answer else 'No'}\n"
+        self.log_event("turn", turn=self.questions_asked, question=question, answer=answer)
+
+    def add_forfeit(self, reason: str):
+        """Record a turn forfeited because the guesser produced no valid question.
+
+        The turn counts as asked but adds nothing to the history; its number is kept in
+        forfeited_turns so the game can be replayed turn by turn.
+
+        Args:
+            reason: Why no valid question was produced
+        """
+        self.questions_asked += 1
+        self.forfeited_turns.append(self.questions_asked)
+        self.add_error_log(LogType.GAME_EVENT, f"Turn forfeited: {reason}")
+        self.log_event("forfeit", turn=self.questions_asked, reason=reason)
+
+    def log_event(self, event: str, **fields):
+        """Append one event record for this game to the game log, if there is one.
+
+        Args:
+            event: Event name, e.g. 'game_start', 'turn', 'forfeit', 'log' or 'game_over'
+            **fields: Event specific fields
+        """
+        if self.log_writer is not None:
+            self.log_writer.write(
+                {"game_id": self.game_id, "timestamp": datetime.now().isoformat(), "event": event, **fields}
+            )
+
+    def end_game(self, winner: str):
+        """Mark the game as over and log its outcome.
+
+        Args:
+            winner: 'guesser' or 'host'
+        """
+        self.game_over = True
+        self.winner = winner
+        self.log_event("game_over", winner=winner, topic=self.topic, questions_asked=self.questions_asked)
+
+    def branch(self, question: str, answer: bool) -> "GameState":
+        """Copy of this state with one more hypothetical turn recorded.
+
+        Used to prepare the next question before the host has actually answered. The branch
+        shares the trace and game id but has its own history and error logs, and does not
+        write to the game log.
+
+        Args:
+            question: The question being answered
+            answer: The hypothetical answer
+
+        Returns:
+            GameState: The branched state
+        """
+        branched = GameState(self.topic, game_id=self.game_id)
+        branched.questions_asked = self.questions_asked
+        branched.previous_questions = list(self.previous_questions)
+        branched.previous_answers = self.previous_answers.copy()
+        branched.error_logs = list(self.error_logs)
+        branched.trace = self.trace
+        branched.question_index = self.question_index.copy()
+        branched.candidate_questions = list(self.candidate_questions)
+        branched.forfeited_turns = list(self.forfeited_turns)
+        branched._context = self._context
+        branched.add_turn(question, answer)
+        return branched
 
     def add_error_log(
         self, log_type: LogType, message: str, question: Optional[str] = None, details: Optional[Dict] = None
@@ -64,6 +266,95 @@ class GameState:
             details=details,
         )
         self.error_logs.append(log)
+        self.log_event("log", **log.to_dict())
+
+    def extend_logs(self, logs: Iterable[GameLog]):
+        """Adopt log entries recorded elsewhere, e.g. on a speculative branch of this game.
+
+        Args:
+            logs: Entries to append and write to the game log
+        """
+        for log in logs:
+            self.error_logs.append(log)
+            self.log_event("log", **log.to_dict())
+
+    def to_checkpoint(self) -> dict:
+        """Compact, JSON serialisable snapshot of the game's progress.
+
+        Holds what is needed to continue the game without calling the LLM again: the topic,
+        the Q&A history (answers packed into hex bits) and the pooled candidate questions.
+        Logs and traces are not included, as they are already streamed to the game log.
+
+        Returns:
+            dict: The checkpoint
+        """
+        return {
+            "version": CHECKPOINT_VERSION,
+            "game_id": self.game_id,
+            "topic": self.topic,
+            "questions_asked": self.questions_asked,
+            "questions": self.previous_questions,
+            "answers": self.previous_answers.to_hex(),
+            "candidate_questions": self.candidate_questions,
+            "forfeited_turns": self.forfeited_turns,
+            "game_over": self.game_over,
+            "winner": self.winner,
+        }
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint: dict, log_writer: Optional[JsonlLogWriter] = None) -> "GameState":
+        """Rebuild a game state from `to_checkpoint` output.
+
+        Args:
+            checkpoint: The checkpoint
+            log_writer: Optional game log for the events of the resumed game
+
+        Returns:
+            GameState: State with the history, context and similarity index re-hydrated
+
+        Raises:
+            ValueError: When the checkpoint has an unsupported version
+        """
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {checkpoint.get('version')!r}")
+        questions = checkpoint["questions"]
+        answers = PackedAnswers.from_hex(checkpoint["answers"], len(questions))
+        state = cls(checkpoint["topic"], game_id=checkpoint["game_id"])
+        for question, answer in zip(questions, answers):
+            state.add_turn(question, answer)
+        # Forfeited turns count as asked without adding to the history
+        state.questions_asked = checkpoint["questions_asked"]
+        state.candidate_questions = list(checkpoint["candidate_questions"])
+        state.forfeited_turns = list(checkpoint.get("forfeited_turns", []))
+        state.game_over = checkpoint["game_over"]
+        state.winner = checkpoint["winner"]
+        state.log_writer = log_writer
+        return state
+
+    def save_checkpoint(self, filepath: str):
+        """Atomically write the checkpoint to a file, replacing any previous one.
+
+        Args:
+            filepath: Path of the checkpoint file
+        """
+        temporary_path = f"{filepath}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file_handle:
+            json.dump(self.to_checkpoint(), file_handle, separators=(",", ":"))
+        os.replace(temporary_path, filepath)
+
+    @classmethod
+    def load_checkpoint(cls, filepath: str, log_writer: Optional[JsonlLogWriter] = None) -> "GameState":
+        """Read a checkpoint file written by `save_checkpoint`.
+
+        Args:
+            filepath: Path of the checkpoint file
+            log_writer: Optional game log for the events of the resumed game
+
+        Returns:
+            GameState: The restored state
+        """
+        with open(filepath, encoding="utf-8") as file_handle:
+            return cls.from_checkpoint(json.load(file_handle), log_writer)
 
     def export_logs(self, filepath: str):
         """Export error logs to a JSON file.
@@ -71,16 +362,16 @@ class GameState:
         Args:
             filepath: Path where the JSON file should be saved
         """
-        logs_dict = [
-            {
-                "timestamp": log.timestamp,
-                "type": log.log_type.value,
-                "message": log.message,
-                "question": log.question,
-                "details": log.details,
-            }
-            for log in self.error_logs
-        ]
+        logs_dict = [log.to_dict() for log in self.error_logs]
 
         with open(filepath, "w", encoding="utf-8") as file_handle:
             json.dump(logs_dict, file_handle, indent=2)
+
+    def export_trace(self, filepath: str):
+        """Export the game's turn spans and LLM call records to a JSON file.
+
+        Args:
+            filepath: Path where the JSON file should be saved
+        """
+        with open(filepath, "w", encoding="utf-8") as file_handle:
+            json.dump(self.trace.to_dict(), file_handle, indent=2)
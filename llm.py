@@ -1,8 +1,41 @@
-"""Module for handling LLM (Large Language Model) interactions via the Anthropic API."""
+"""Module for handling LLM (Large Language Model) interactions through pluggable backends."""
 # pylint: disable-msg=C0301,R0903
-from typing import Optional
+import asyncio
+import random
+import re
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
-from anthropic import Anthropic, APIError, RateLimitError  # pylint: disable=import-error
+from anthropic import (  # pylint: disable=import-error
+    Anthropic,
+    APIConnectionError,
+    APIError,
+    AsyncAnthropic,
+    RateLimitError,
+)
+
+from tracing import LLMCallTracker
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors and overload
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
 
 
 class LLMError(Exception):
@@ -13,48 +46,720 @@ class LLMError(Exception):
         self.original_error = original_error
 
 
-class LLMInterface:
-    """Interface for interacting with the Anthropic Claude API."""
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate.
+
+    Callers reserve capacity up front and are told how long to wait before using it,
+    which lets the same bucket serve blocking threads and asyncio tasks.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """Initialize the bucket.
+
+        Args:
+            rate_per_minute: Sustained refill rate
+            capacity: Burst size, defaults to one minute's worth of tokens
+        """
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Reserve capacity, possibly going into debt.
+
+        Args:
+            amount: Number of tokens to take
+
+        Returns:
+            Seconds the caller has to wait before the reservation is covered
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_second
+
+    def adjust(self, amount: float):
+        """Take (positive) or return (negative) tokens after the real cost is known."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+
+class RetryPolicy:
+    """Bounded retry budget with jittered exponential backoff that honors retry-after."""
+
+    def __init__(self, max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 30.0):
+        """Initialize the policy.
+
+        Args:
+            max_retries: Retries allowed per call after the first attempt
+            base_delay: Backoff ceiling for the first retry in seconds
+            max_delay: Upper bound for a single backoff in seconds
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        """Whether an error is transient and the call may be retried."""
+        if isinstance(error, APIConnectionError):
+            return True
+        return getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES
+
+    @staticmethod
+    def retry_after(error: Exception) -> Optional[float]:
+        """Read the server's retry-after hint in seconds from an API error, if present."""
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            return None
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+
+    def delay(self, attempt: int, error: Exception) -> float:
+        """Backoff before retry number `attempt` (starting at 0), using full jitter.
+
+        Args:
+            attempt: Zero-based retry index
+            error: The error that triggered the retry
+
+        Returns:
+            Seconds to sleep before retrying
+        """
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        retry_after = self.retry_after(error)
+        if retry_after is not None:
+            backoff = max(retry_after, backoff)
+        return min(self.max_delay, backoff)
+
+
+class RequestScheduler:
+    """Admission control for LLM requests shared by all agents and games using it.
+
+    Combines request and token rate limits, a concurrency cap and a retry policy. Blocking
+    callers share one cap across threads; asyncio callers wait on a semaphore per event loop,
+    so each loop gets its own cap and waiters are admitted in FIFO order without polling.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: int = 16,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            requests_per_minute: Request rate limit, unlimited when None
+            tokens_per_minute: Token rate limit, unlimited when None
+            max_concurrency: Maximum requests in flight at once, across threads and per event loop
+            retry_policy: Retry policy, defaults to RetryPolicy()
+        """
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retries = 0
+        self.rate_limited = 0
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._async_slots = weakref.WeakKeyDictionary()
+        self._async_slots_lock = threading.Lock()
+
+    def _admission_delay(self, estimated_tokens: int) -> float:
+        """Reserve rate limit capacity for one request and return the wait it implies."""
+        delay = 0.0
+        if self.request_bucket is not None:
+            delay = max(delay, self.request_bucket.reserve(1))
+        if self.token_bucket is not None:
+            delay = max(delay, self.token_bucket.reserve(estimated_tokens))
+        return delay
+
+    def _loop_slots(self) -> asyncio.Semaphore:
+        """Return the concurrency semaphore belonging to the currently running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._async_slots_lock:
+            slots = self._async_slots.get(loop)
+            if slots is None:
+                slots = asyncio.Semaphore(self.max_concurrency)
+                self._async_slots[loop] = slots
+            return slots
+
+    def settle_tokens(self, estimated_tokens: int, actual_tokens: int):
+        """Correct the token bucket once a response reports its real usage."""
+        if self.token_bucket is not None:
+            self.token_bucket.adjust(actual_tokens - estimated_tokens)
+
+    def _settle_attempt(self, estimated_tokens: int, result: T, usage: Optional[Callable[[T], int]]):
+        """Reconcile one attempt's token reservation with what it cost."""
+        if usage is not None:
+            self.settle_tokens(estimated_tokens, usage(result))
+
+    def _on_failure(self, attempt: int, error: Exception) -> float:
+        """Decide whether to retry a failed attempt; returns the backoff or re-raises."""
+        if attempt >= self.retry_policy.max_retries or not self.retry_policy.is_retryable(error):
+            raise error
+        self.retries += 1
+        if getattr(error, "status_code", None) == 429:
+            self.rate_limited += 1
+        return self.retry_policy.delay(attempt, error)
+
+    def run(
+        self, call: Callable[[], T], estimated_tokens: int = 0, usage: Optional[Callable[[T], int]] = None
+    ) -> T:
+        """Run a blocking request under the rate limits, concurrency cap and retry policy.
+
+        Every attempt reserves `estimated_tokens`. A failed attempt returns its reservation,
+        since rejected requests are not billed; a successful one is settled against `usage`.
+
+        Args:
+            call: Zero-argument function performing one request attempt
+            estimated_tokens: Token cost reserved against the token bucket per attempt
+            usage: Function returning the tokens a result counts against the rate limit;
+                without it successful attempts keep their estimate
+
+        Returns:
+            The call's result
+
+        Raises:
+            Exception: The last error once it is not retryable or the retry budget is spent
+        """
+        attempt = 0
+        while True:
+            time.sleep(self._admission_delay(estimated_tokens))
+            self._slots.acquire()
+            try:
+                result = call()
+            except Exception as error:
+                self.settle_tokens(estimated_tokens, 0)
+                backoff = self._on_failure(attempt, error)
+            else:
+                self._settle_attempt(estimated_tokens, result, usage)
+                return result
+            finally:
+                self._slots.release()
+            time.sleep(backoff)
+            attempt += 1
+
+    async def run_async(
+        self,
+        call: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 0,
+        usage: Optional[Callable[[T], int]] = None,
+    ) -> T:
+        """Asynchronous version of run.
+
+        Cancelled attempts keep their reservation, as their partial cost is unknown.
+
+        Args:
+            call: Zero-argument function returning a new awaitable for each attempt
+            estimated_tokens: Token cost reserved against the token bucket per attempt
+            usage: Function returning the tokens a result counts against the rate limit
+
+        Returns:
+            The call's result
+
+        Raises:
+            Exception: The last error once it is not retryable or the retry budget is spent
+        """
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._admission_delay(estimated_tokens))
+            async with self._loop_slots():
+                try:
+                    result = await call()
+                except Exception as error:
+                    self.settle_tokens(estimated_tokens, 0)
+                    backoff = self._on_failure(attempt, error)
+                else:
+                    self._settle_attempt(estimated_tokens, result, usage)
+                    return result
+            await asyncio.sleep(backoff)
+            attempt += 1
+
+
+@dataclass
+class LLMResponse:
+    """Data class holding a completion, or a streamed chunk of one, and its token usage.
+
+    `input_tokens` excludes prompt tokens read from or written to the prompt cache, which are
+    reported separately.
+    """
+
+    text: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """Prompt split by how often its parts change, so providers can cache the stable ones.
+
+    `system` holds static instructions shared by every call of a kind, `prefix` content that
+    only grows by appending lines or stays fixed within a game (topic, Q&A history), and
+    `suffix` the per-call remainder. Providers without prompt caching use the rendered text.
+    """
+
+    system: str
+    prefix: str = ""
+    suffix: str = ""
+
+    def render(self) -> str:
+        """Flatten the prompt into plain text."""
+        return "\n".join(part for part in (self.system, self.prefix, self.suffix) if part)
+
+    def prefix_blocks(self) -> List[str]:
+        """The prefix split into one block per line, blank lines joining the previous block.
+
+        Since the prefix only grows by appending lines, the blocks of an earlier call are a
+        leading subset of a later call's blocks, so block boundaries stay stable across turns.
+        """
+        blocks: List[str] = []
+        for line in self.prefix.splitlines(keepends=True):
+            if blocks and (not line.strip() or not blocks[-1].strip()):
+                blocks[-1] += line
+            else:
+                blocks.append(line)
+        return blocks
+
+
+def render_prompt(prompt: Union[str, Prompt]) -> str:
+    """Plain text of a prompt given either as a string or as a Prompt."""
+    return prompt.render() if isinstance(prompt, Prompt) else prompt
+
+
+_YES_NO_PATTERN = re.compile(r"\b(yes|no)\b")
+
+
+def first_yes_no(text: str) -> Optional[str]:
+    """Terminal condition for host answers: the first standalone 'yes' or 'no' in the text."""
+    match = _YES_NO_PATTERN.search(text.lower())
+    return match.group(1) if match else None
+
+
+def first_question_line(text: str) -> Optional[str]:
+    """Terminal condition for guesser questions: the line holding the first '?', up to the '?'.
+
+    Preamble lines without a '?' (e.g. 'Here is my next question:') are skipped rather than
+    taken as the question, so the stream continues until a question arrives.
+    """
+    question_end = text.find("?")
+    if question_end == -1:
+        return None
+    line_start = text.rfind("\n", 0, question_end) + 1
+    return text[line_start : question_end + 1].strip()
+
+
+def first_nonempty_line(text: str) -> str:
+    """Fallback for responses that ended without meeting the cutoff: their first non-empty line."""
+    return next((line.strip() for line in text.splitlines() if line.strip()), "")
+
+
+@dataclass(frozen=True)
+class RoleSettings:
+    """Data class with per-role generation limits.
+
+    `cutoff` returns the final text once the accumulated output satisfies the role's terminal
+    condition, or None while more output is needed. Streaming stops at that point; complete
+    responses are trimmed the same way. `fallback` trims a response that ended without
+    meeting the condition.
+    """
+
+    max_tokens: int = 1024
+    stop_sequences: Tuple[str, ...] = ()
+    cutoff: Optional[Callable[[str], Optional[str]]] = None
+    fallback: Optional[Callable[[str], str]] = None
+
+
+DEFAULT_ROLE_SETTINGS = {
+    "host": RoleSettings(max_tokens=5, cutoff=first_yes_no),
+    "guesser": RoleSettings(
+        max_tokens=100,
+        stop_sequences=("\nA:", "\nQ:"),
+        cutoff=first_question_line,
+        fallback=first_nonempty_line,
+    ),
+    "guesser_candidates": RoleSettings(max_tokens=400, stop_sequences=("\nA:", "\nQ:")),
+}
+
+
+class LLMBackend(Protocol):
+    """Protocol implemented by LLM providers that LLMInterface can drive.
+
+    A backend performs exactly one request attempt per call; rate limiting and retries
+    are applied on top of it by the interface's RequestScheduler. Errors meant to be
+    retried should carry an HTTP-like `status_code` (see RetryPolicy.is_retryable).
+    """
+
+    def complete(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> LLMResponse:
+        """Generate a completion for the prompt."""
+
+    async def complete_async(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> LLMResponse:
+        """Asynchronous version of complete; cancelling it must abort the request."""
+
+    def stream(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> Iterator[LLMResponse]:
+        """Stream a completion as text deltas carrying the usage known so far.
+
+        Closing the generator early must abort the request.
+        """
+
+    def stream_async(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> AsyncIterator[LLMResponse]:
+        """Asynchronous version of stream."""
+
+
+class AnthropicBackend:
+    """LLM backend calling the Anthropic Claude API."""
 
     def __init__(self, api_key: str, model: str = "claude-3-opus-20240229"):
-        """Initialize the LLM interface.
+        """Initialize the backend.
 
         Args:
             api_key: Anthropic API key for authentication
             model: Model identifier to use for generation
         """
         self.api_key = api_key
-        self.max_tokens = 1024
-        self.llm_client = Anthropic(
-            api_key=api_key,
+        self.model = model
+        # Retries are owned by the scheduler, so the SDK's own retry loop is disabled
+        self.llm_client = Anthropic(api_key=api_key, max_retries=0)
+        # Async clients hold a connection pool bound to the event loop they were first used on,
+        # so one client is kept per running loop.
+        self._async_clients = weakref.WeakKeyDictionary()
+
+    def _get_async_client(self) -> AsyncAnthropic:
+        """Return the async client belonging to the currently running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = AsyncAnthropic(api_key=self.api_key, max_retries=0)
+            self._async_clients[loop] = client
+        return client
+
+    def _request(self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str]) -> dict:
+        """Keyword arguments of a Messages API request.
+
+        Structured prompts put cache breakpoints after the system instructions and after the
+        prefix, so calls sharing them only pay full price for the suffix. The prefix is sent as
+        one content block per line: the API looks for cached prefixes at earlier block
+        boundaries too, so a call can read the history cached by the previous turn's call and
+        only pays the cache write for the lines added since.
+        """
+        request = {"max_tokens": max_tokens, "model": self.model}
+        if isinstance(prompt, Prompt):
+            cache_control = {"type": "ephemeral"}
+            request["system"] = [{"type": "text", "text": prompt.system, "cache_control": cache_control}]
+            content = [{"type": "text", "text": block} for block in prompt.prefix_blocks()]
+            if content:
+                content[-1]["cache_control"] = cache_control
+            if prompt.suffix:
+                content.append({"type": "text", "text": prompt.suffix})
+            request["messages"] = [{"role": "user", "content": content}]
+        else:
+            request["messages"] = [{"role": "user", "content": prompt}]
+        if stop_sequences:
+            request["stop_sequences"] = list(stop_sequences)
+        return request
+
+    @staticmethod
+    def _to_response(message) -> LLMResponse:
+        """Convert an Anthropic message into an LLMResponse."""
+        return LLMResponse(
+            text=message.content[0].text,
+            input_tokens=message.usage.input_tokens,
+            output_tokens=message.usage.output_tokens,
+            cache_read_tokens=getattr(message.usage, "cache_read_input_tokens", None) or 0,
+            cache_write_tokens=getattr(message.usage, "cache_creation_input_tokens", None) or 0,
+        )
+
+    @staticmethod
+    def _to_chunk(event, usage: LLMResponse) -> Optional[LLMResponse]:
+        """Fold a stream event into the running usage and return a text delta chunk, if any."""
+        if event.type == "message_start":
+            usage.input_tokens = event.message.usage.input_tokens
+            usage.cache_read_tokens = getattr(event.message.usage, "cache_read_input_tokens", None) or 0
+            usage.cache_write_tokens = getattr(event.message.usage, "cache_creation_input_tokens", None) or 0
+        elif event.type == "message_delta":
+            usage.output_tokens = event.usage.output_tokens
+        elif event.type == "content_block_delta" and getattr(event.delta, "text", None):
+            return LLMResponse(
+                event.delta.text,
+                usage.input_tokens,
+                usage.output_tokens,
+                usage.cache_read_tokens,
+                usage.cache_write_tokens,
+            )
+        return None
+
+    def complete(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> LLMResponse:
+        """Send one Messages API request."""
+        message = self.llm_client.messages.create(**self._request(prompt, max_tokens, stop_sequences))
+        return self._to_response(message)
+
+    async def complete_async(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> LLMResponse:
+        """Send one Messages API request on the current loop's async client."""
+        message = await self._get_async_client().messages.create(
+            **self._request(prompt, max_tokens, stop_sequences)
+        )
+        return self._to_response(message)
+
+    def stream(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> Iterator[LLMResponse]:
+        """Stream one Messages API request; closing the generator closes the HTTP response."""
+        usage = LLMResponse("")
+        with self.llm_client.messages.stream(**self._request(prompt, max_tokens, stop_sequences)) as events:
+            for event in events:
+                chunk = self._to_chunk(event, usage)
+                if chunk is not None:
+                    yield chunk
+
+    async def stream_async(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> AsyncIterator[LLMResponse]:
+        """Asynchronous version of stream."""
+        usage = LLMResponse("")
+        async with self._get_async_client().messages.stream(
+            **self._request(prompt, max_tokens, stop_sequences)
+        ) as events:
+            async for event in events:
+                chunk = self._to_chunk(event, usage)
+                if chunk is not None:
+                    yield chunk
+
+
+def _billed_tokens(response: LLMResponse) -> int:
+    """Tokens a response counts against the token rate limit."""
+    # Cache reads do not count towards input token rate limits, cache writes do
+    return response.input_tokens + response.cache_write_tokens + response.output_tokens
+
+
+def _to_llm_error(error: Exception) -> LLMError:
+    """Wrap a backend error into an LLMError with a message describing its kind."""
+    if isinstance(error, RateLimitError) or getattr(error, "status_code", None) == 429:
+        return LLMError(f"Rate Limit Exceeded: {str(error)}", error)
+    if isinstance(error, APIError):
+        return LLMError(f"API Error: {str(error)}", error)
+    return LLMError(f"Unexpected error during LLM call: {str(error)}", error)
+
+
+class _StreamAccumulator:
+    """Collects streamed chunks until the role's cutoff condition is met."""
+
+    def __init__(self, settings: RoleSettings):
+        self.cutoff = settings.cutoff
+        self.fallback = settings.fallback
+        self.text = ""
+        self.final_text: Optional[str] = None
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+
+    def add(self, chunk: LLMResponse) -> bool:
+        """Add one chunk; returns True once the response is complete."""
+        self.text += chunk.text
+        self.input_tokens = max(self.input_tokens, chunk.input_tokens)
+        self.output_tokens = max(self.output_tokens, chunk.output_tokens)
+        self.cache_read_tokens = max(self.cache_read_tokens, chunk.cache_read_tokens)
+        self.cache_write_tokens = max(self.cache_write_tokens, chunk.cache_write_tokens)
+        if self.cutoff is not None:
+            self.final_text = self.cutoff(self.text)
+        return self.final_text is not None
+
+    def response(self, prompt: Union[str, Prompt]) -> LLMResponse:
+        """Build the final response, estimating usage the stream did not report before the cutoff."""
+        text = self.final_text
+        if text is None:
+            text = self.fallback(self.text) if self.fallback is not None else self.text
+        return LLMResponse(
+            text=text,
+            input_tokens=self.input_tokens or LLMInterface.estimate_tokens(prompt),
+            output_tokens=self.output_tokens or LLMInterface.estimate_tokens(self.text),
+            cache_read_tokens=self.cache_read_tokens,
+            cache_write_tokens=self.cache_write_tokens,
         )
+
+
+class LLMInterface:
+    """Interface for generating responses through a pluggable LLM backend."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "claude-3-opus-20240229",
+        scheduler: Optional[RequestScheduler] = None,
+        backend: Optional[LLMBackend] = None,
+        streaming: bool = False,
+        role_settings: Optional[Dict[str, RoleSettings]] = None,
+    ):
+        """Initialize the LLM interface.
+
+        Args:
+            api_key: Anthropic API key, used when no backend is given
+            model: Model identifier to use for generation
+            scheduler: Request scheduler owning rate limits and retries, shareable across interfaces
+            backend: Provider performing the requests, defaults to AnthropicBackend
+            streaming: Stream responses and stop as soon as the role's terminal condition is met
+            role_settings: Per-role max_tokens, stop sequences and cutoff, defaults to DEFAULT_ROLE_SETTINGS
+        """
+        self.api_key = api_key
+        self.max_tokens = 1024
         self.model = model
+        self.scheduler = scheduler or RequestScheduler()
+        self.backend = backend if backend is not None else AnthropicBackend(api_key, model)
+        self.streaming = streaming
+        self.role_settings = role_settings if role_settings is not None else dict(DEFAULT_ROLE_SETTINGS)
+
+    @staticmethod
+    def estimate_tokens(prompt: Union[str, Prompt]) -> int:
+        """Rough token estimate (~4 characters per token) used for rate limit admission."""
+        return len(render_prompt(prompt)) // 4 + 1
+
+    def _settings(self, role: Optional[str]) -> RoleSettings:
+        return self.role_settings.get(role) or RoleSettings(max_tokens=self.max_tokens)
+
+    @staticmethod
+    def _apply_cutoff(response: LLMResponse, settings: RoleSettings) -> LLMResponse:
+        """Trim a complete response to the role's terminal condition, when it is met."""
+        if settings.cutoff is not None:
+            final_text = settings.cutoff(response.text)
+            if final_text is not None:
+                response.text = final_text
+            elif settings.fallback is not None:
+                response.text = settings.fallback(response.text)
+        return response
+
+    def _stream(self, prompt: Union[str, Prompt], settings: RoleSettings) -> LLMResponse:
+        accumulator = _StreamAccumulator(settings)
+        chunks = self.backend.stream(prompt, settings.max_tokens, settings.stop_sequences)
+        try:
+            for chunk in chunks:
+                if accumulator.add(chunk):
+                    break
+        finally:
+            chunks.close()
+        return accumulator.response(prompt)
+
+    async def _stream_async(self, prompt: Union[str, Prompt], settings: RoleSettings) -> LLMResponse:
+        accumulator = _StreamAccumulator(settings)
+        chunks = self.backend.stream_async(prompt, settings.max_tokens, settings.stop_sequences)
+        try:
+            async for chunk in chunks:
+                if accumulator.add(chunk):
+                    break
+        finally:
+            await chunks.aclose()
+        return accumulator.response(prompt)
 
-    def generate_response(self, prompt: str) -> str:
-        """Interact with Claude API to generate response.
+    def generate_response(
+        self, prompt: Union[str, Prompt], agent: Optional[str] = None, role: Optional[str] = None
+    ) -> str:
+        """Generate a response through the backend.
 
         Args:
-            prompt: The input prompt for the LLM
+            prompt: The input prompt for the LLM, plain or split into cacheable parts
+            agent: Name of the calling agent, recorded in traces
+            role: Role of the calling agent, selecting its RoleSettings
 
         Returns:
-            The LLM's response text
+            The LLM's response text, trimmed to the role's terminal condition
 
         Raises:
             LLMError: When any error occurs during LLM interaction
         """
+        settings = self._settings(role)
+        if self.streaming:
+
+            def request() -> LLMResponse:
+                return self._stream(prompt, settings)
+
+        else:
+
+            def request() -> LLMResponse:
+                return self._apply_cutoff(
+                    self.backend.complete(prompt, settings.max_tokens, settings.stop_sequences), settings
+                )
+
+        estimated_tokens = self.estimate_tokens(prompt)
+        tracker = LLMCallTracker(agent, role)
         try:
-            message = self.llm_client.messages.create(
-                max_tokens=self.max_tokens, messages=[{"role": "user", "content": prompt}], model=self.model
-            )
-            return message.content[0].text
+            response = self.scheduler.run(tracker.count_attempts(request), estimated_tokens, _billed_tokens)
+        except Exception as error:
+            tracker.finish("error")
+            raise _to_llm_error(error) from error
+
+        tracker.finish("ok", response)
+        return response.text
+
+    async def generate_response_async(
+        self, prompt: Union[str, Prompt], agent: Optional[str] = None, role: Optional[str] = None
+    ) -> str:
+        """Asynchronous version of generate_response.
+
+        Cancelling the awaiting task aborts the underlying request, so callers racing
+        several requests can drop the losers without paying for their completions.
+
+        Args:
+            prompt: The input prompt for the LLM, plain or split into cacheable parts
+            agent: Name of the calling agent, recorded in traces
+            role: Role of the calling agent, selecting its RoleSettings
 
-        except APIError as api_error:
-            raise LLMError(f"API Error: {str(api_error)}", api_error) from api_error
+        Returns:
+            The LLM's response text, trimmed to the role's terminal condition
+
+        Raises:
+            LLMError: When any error occurs during LLM interaction
+        """
+        settings = self._settings(role)
+        if self.streaming:
 
-        except RateLimitError as rate_error:
-            raise LLMError(f"Rate Limit Exceeded: {str(rate_error)}", rate_error) from rate_error
+            async def request() -> LLMResponse:
+                return await self._stream_async(prompt, settings)
+
+        else:
+
+            async def request() -> LLMResponse:
+                response = await self.backend.complete_async(
+                    prompt, settings.max_tokens, settings.stop_sequences
+                )
+                return self._apply_cutoff(response, settings)
+
+        estimated_tokens = self.estimate_tokens(prompt)
+        tracker = LLMCallTracker(agent, role)
+        try:
+            response = await self.scheduler.run_async(
+                tracker.count_attempts(request), estimated_tokens, _billed_tokens
+            )
+        except asyncio.CancelledError:
+            tracker.finish("cancelled")
+            raise
+        except Exception as error:
+            tracker.finish("error")
+            raise _to_llm_error(error) from error
 
-        except Exception as unknown_error:
-            raise LLMError(
-                f"Unexpected error during LLM call: {str(unknown_error)}", unknown_error
-            ) from unknown_error
+        tracker.finish("ok", response)
+        return response.text
@@ -1,62 +1,291 @@
 """Main module for running the 20 questions game with LLM-powered agents."""
 # pylint: disable-msg=C0301,R0903
+import argparse
 import json
+import os
+from typing import Optional
 
 # from agent import GameState, GuesserAgent, HostAgent
 from agent import GuesserAgent, HostAgent, MultipleGuesserAgent
-from game_manager import MultipleAgentGameManager, SingleGameManager
-from llm import LLMInterface
+from cache import AnswerCache
+from game_log import JsonlLogWriter
+from game_manager import BaseGameManager, MultipleAgentGameManager, SingleGameManager, run_sync
+from llm import LLMInterface, RequestScheduler, RetryPolicy
+from simulated_llm import SimulatedBackend
+from strategy import InformationGainStrategy
+from topics import TopicCatalog
 
 
-def play_game(host_name: str = "IntelligenceBot") -> dict:
-    """Play a complete game and return the results.
+def load_config(filepath: str = "config.json") -> dict:
+    """Load the game configuration.
 
     Args:
-        host_name: Name for the host agent
-        guesser_name: Name for the guesser agent
+        filepath: Path to the JSON config file
 
     Returns:
-        dict: Game results including winner, topic, questions asked, and game log
+        dict: Parsed configuration
     """
-    with open("config.json", encoding="utf-8") as config_file:
-        config = json.load(config_file)
+    with open(filepath, encoding="utf-8") as config_file:
+        return json.load(config_file)
 
-    # set up llm manager
-    api_key = config["api_key"]
-    llm = LLMInterface(api_key=api_key)
+
+def build_llm(config: dict) -> LLMInterface:
+    """Create the LLM interface, applying the config's optional "rate_limits" section.
+
+    Setting "llm_backend" to "simulated" replaces the Anthropic API with an offline
+    SimulatedBackend configured by the "simulated_llm" section.
+
+    Args:
+        config: Game configuration
+
+    Returns:
+        LLMInterface: Interface whose scheduler is shared by every agent using it
+    """
+    limits = config.get("rate_limits", {})
+    scheduler = RequestScheduler(
+        requests_per_minute=limits.get("requests_per_minute"),
+        tokens_per_minute=limits.get("tokens_per_minute"),
+        max_concurrency=limits.get("max_concurrency", 16),
+        retry_policy=RetryPolicy(max_retries=limits.get("max_retries", 4)),
+    )
+    backend = None
+    if config.get("llm_backend") == "simulated":
+        backend = SimulatedBackend(**config.get("simulated_llm", {}))
+    return LLMInterface(
+        api_key=config.get("api_key"),
+        scheduler=scheduler,
+        backend=backend,
+        streaming=config.get("streaming", False),
+    )
+
+
+def build_answer_cache(config: dict) -> Optional[AnswerCache]:
+    """Create the host answer cache described by the config's "answer_cache" section.
+
+    Args:
+        config: Game configuration
+
+    Returns:
+        Optional[AnswerCache]: The cache, or None when caching is not configured
+    """
+    cache_config = config.get("answer_cache")
+    if not cache_config:
+        return None
+    return AnswerCache(
+        max_size=cache_config.get("max_size", 4096),
+        path=cache_config.get("path"),
+        commit_every=cache_config.get("commit_every", 64),
+        commit_interval=cache_config.get("commit_interval", 1.0),
+    )
+
+
+def build_topic_catalog(config: dict) -> Optional[TopicCatalog]:
+    """Load the topic catalog described by the config's "topics" section.
+
+    Args:
+        config: Game configuration
+
+    Returns:
+        Optional[TopicCatalog]: The catalog, or None when no catalog is configured
+    """
+    topics_config = config.get("topics")
+    if not topics_config:
+        return None
+    return TopicCatalog.load(topics_config["path"])
+
+
+def topic_seed(config: dict, game_index: int = 0) -> Optional[int]:
+    """Topic sampling seed of a game: the configured "topics" seed offset by the game index.
+
+    Args:
+        config: Game configuration
+        game_index: Index of the game within a batch run
+
+    Returns:
+        Optional[int]: The seed, or None for unseeded sampling
+    """
+    seed = config.get("topics", {}).get("seed")
+    return None if seed is None else seed + game_index
+
+
+def build_game_manager(
+    config: dict,
+    llm: LLMInterface,
+    host_name: str = "IntelligenceBot",
+    answer_cache: Optional[AnswerCache] = None,
+    log_writer: Optional[JsonlLogWriter] = None,
+    checkpoint_path: Optional[str] = None,
+    topic_catalog: Optional[TopicCatalog] = None,
+    seed: Optional[int] = None,
+) -> BaseGameManager:
+    """Create the host, guesser agent(s) and game manager described by the config.
+
+    Args:
+        config: Game configuration
+        llm: LLM interface shared by all agents
+        host_name: Name for the host agent
+        answer_cache: Optional host answer cache shared across games
+        log_writer: Optional JSON Lines game log shared across games
+        checkpoint_path: Optional file the game is checkpointed to after every turn
+        topic_catalog: Optional topic catalog shared across games
+        seed: Seed for the host's topic sampling
+
+    Returns:
+        BaseGameManager: Game manager ready for start_game
+    """
+    max_questions = config.get("max_questions", 20)
+    speculation = config.get("speculation")
 
     # set up host agent
-    host = HostAgent(name=host_name, role="host", llm=llm)
+    host = HostAgent(
+        name=host_name,
+        role="host",
+        llm=llm,
+        answer_cache=answer_cache,
+        topic_catalog=topic_catalog,
+        seed=seed,
+    )
 
     # set up guesser agent(s) and corresponding game manager
+    num_candidates = config.get("num_candidates", 1)
+    strategy = None
+    if topic_catalog is not None and config.get("guesser_strategy") == "information_gain":
+        strategy = InformationGainStrategy(topic_catalog)
     if config["game_mode"] == "single":
-        guesser = GuesserAgent(name="Test Guesser", role="guesser", llm=llm)
-        game_manager = SingleGameManager(host, guesser)
-    else:
-        guessers = [MultipleGuesserAgent(f"Player_{i}", "guesser", llm) for i in range(config["num_agents"])]
-        game_manager = MultipleAgentGameManager(host, guessers)
+        guesser = GuesserAgent(
+            name="Test Guesser", role="guesser", llm=llm, num_candidates=num_candidates, strategy=strategy
+        )
+        return SingleGameManager(
+            host,
+            guesser,
+            max_questions=max_questions,
+            speculation=speculation,
+            max_attempts=config.get("max_question_attempts", 5),
+            log_writer=log_writer,
+            checkpoint_path=checkpoint_path,
+        )
+
+    guessers = [
+        MultipleGuesserAgent(f"Player_{i}", "guesser", llm, num_candidates=num_candidates, strategy=strategy)
+        for i in range(config["num_agents"])
+    ]
+    return MultipleAgentGameManager(
+        host,
+        guessers,
+        max_questions=max_questions,
+        speculation=speculation,
+        log_writer=log_writer,
+        checkpoint_path=checkpoint_path,
+        fan_out=config.get("fan_out", "all"),
+        hedge_percentile=config.get("hedge_percentile", 0.9),
+        hedge_budget=config.get("hedge_budget"),
+    )
+
+
+def run_game(game_manager: BaseGameManager, resume_from: Optional[str] = None) -> dict:
+    """Play a game to the end with an already configured game manager.
+
+    Synchronous wrapper for run_game_async, run on the thread's persistent event loop.
+
+    Args:
+        game_manager: Game manager to drive
+        resume_from: Optional checkpoint to continue instead of starting a new game
+
+    Returns:
+        dict: Game results including winner, topic, questions asked, and game log of the
+            turns played by this call
+    """
+    return run_sync(run_game_async(game_manager, resume_from))
+
+
+async def run_game_async(game_manager: BaseGameManager, resume_from: Optional[str] = None) -> dict:
+    """Asynchronous version of run_game, for playing many games on one event loop.
+
+    Args:
+        game_manager: Game manager to drive
+        resume_from: Optional checkpoint to continue instead of starting a new game
 
-    game_manager.start_game()
+    Returns:
+        dict: Game results including winner, topic, questions asked, and game log of the
+            turns played by this call
+    """
+    if resume_from:
+        game_manager.resume_game(resume_from)
+    else:
+        await game_manager.start_game_async()
     game_log = []
 
     while not game_manager.game_state.game_over:
-        _, message = game_manager.play_turn()
+        _, message = await game_manager.play_turn_async()
         game_log.append(message)
 
-    game_manager.game_state.export_logs("output/game_error_logs.json")
-
-    result_and_logs = {
+    return {
+        "game_id": game_manager.game_state.game_id,
         "winner": game_manager.game_state.winner,
         "topic": game_manager.game_state.topic,
         "questions_asked": game_manager.game_state.questions_asked,
+        "questions": game_manager.game_state.previous_questions,
+        "answers": list(game_manager.game_state.previous_answers),
+        "forfeited_turns": game_manager.game_state.forfeited_turns,
         "game_log": game_log,
     }
 
-    with open("output/result_and_logs.json", "w", encoding="utf-8") as log_file:
-        json.dump(result_and_logs, log_file, indent=2)
+
+def play_game(host_name: str = "IntelligenceBot", resume: bool = False) -> dict:
+    """Play a complete game and return the results.
+
+    Turn events and error logs are appended to output/game_events.jsonl while the game runs,
+    and the result to output/game_results.jsonl once it ends, so earlier games are kept and
+    an interrupted game still leaves its turns on disk. The game is checkpointed after every
+    turn to the config's "checkpoint_path" (default output/checkpoint.json, null to disable)
+    until it ends; a game that fails keeps its checkpoint for --resume.
+
+    Args:
+        host_name: Name for the host agent
+        resume: Continue the game left in the checkpoint file, if there is one
+
+    Returns:
+        dict: Game results including winner, topic, questions asked, and game log
+    """
+    config = load_config()
+    checkpoint_path = config.get("checkpoint_path", "output/checkpoint.json")
+
+    # set up llm manager
+    llm = build_llm(config)
+    answer_cache = build_answer_cache(config)
+
+    with JsonlLogWriter("output/game_events.jsonl") as event_log:
+        game_manager = build_game_manager(
+            config,
+            llm,
+            host_name,
+            answer_cache,
+            event_log,
+            checkpoint_path,
+            build_topic_catalog(config),
+            topic_seed(config),
+        )
+        resume_from = (
+            checkpoint_path if resume and checkpoint_path and os.path.exists(checkpoint_path) else None
+        )
+        try:
+            result_and_logs = run_game(game_manager, resume_from)
+        finally:
+            if answer_cache is not None:
+                answer_cache.close()
+        game_manager.game_state.log_event("trace", **game_manager.game_state.trace.to_dict())
+    # The checkpoint is kept when the game fails so it can be resumed, and may not exist at all
+    # when checkpointing is disabled
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    with JsonlLogWriter("output/game_results.jsonl") as result_log:
+        result_log.write(result_and_logs)
 
     return result_and_logs
 
 
 if __name__ == "__main__":
-    play_game()
+    parser = argparse.ArgumentParser(description="Play a 20 questions game")
+    parser.add_argument("--resume", action="store_true", help="continue the last interrupted game")
+    play_game(resume=parser.parse_args().resume)
@@ -0,0 +1,299 @@
+"""Module for replaying recorded games offline to re-score them with the current game logic.
+
+Recorded questions and answers are fed back through SingleGameManager, QuestionValidator and
+win detection, with a ReplayBackend standing in for the LLM, so validator or rule changes
+can be evaluated on thousands of stored games without any API call. Run e.g.:
+    python replay.py output/game_results.jsonl --output replay_report.jsonl
+"""
+# pylint: disable-msg=C0301,R0903,R0902
+import argparse
+import contextlib
+import io
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from agent import GuesserAgent, HostAgent
+from game_log import JsonlLogWriter, read_jsonl
+from game_manager import SingleGameManager
+from game_state import GameState
+from llm import LLMInterface, LLMResponse, Prompt, render_prompt
+
+_HOST_QUESTION_PATTERN = re.compile(r"^Question: (.+)$", re.MULTILINE)
+_LOGGED_TURN_PATTERN = re.compile(r"^Q: (.*)\nA: (Yes|No)$", re.DOTALL)
+_LOGGED_FORFEIT_PREFIX = "Turn forfeited"
+
+
+@dataclass
+class RecordedGame:
+    """Question/answer history and outcome of one recorded game."""
+
+    game_id: Optional[str]
+    topic: str
+    questions: List[str] = field(default_factory=list)
+    answers: List[bool] = field(default_factory=list)
+    forfeited_turns: List[int] = field(default_factory=list)
+    winner: Optional[str] = None
+    questions_asked: int = 0
+
+    @classmethod
+    def from_result(cls, record: dict) -> "RecordedGame":
+        """Build a recorded game from a run_game result record.
+
+        Records without the full history fall back to the 'Q: ...\\nA: ...' lines of the game
+        log, which miss the final question of a game won by the guesser. Records without the
+        forfeited turn numbers take them from the 'Turn forfeited' lines of the game log.
+        """
+        game_log = record.get("game_log", [])
+        if "questions" in record:
+            questions, answers = list(record["questions"]), list(record["answers"])
+        else:
+            turns = [_LOGGED_TURN_PATTERN.match(message) for message in game_log]
+            questions = [turn.group(1) for turn in turns if turn]
+            answers = [turn.group(2) == "Yes" for turn in turns if turn]
+        if "forfeited_turns" in record:
+            forfeited_turns = list(record["forfeited_turns"])
+        else:
+            # Every game log message is one turn
+            forfeited_turns = [
+                turn for turn, message in enumerate(game_log, 1) if message.startswith(_LOGGED_FORFEIT_PREFIX)
+            ]
+        return cls(
+            game_id=record.get("game_id"),
+            topic=record["topic"],
+            questions=questions,
+            answers=answers,
+            forfeited_turns=forfeited_turns,
+            winner=record.get("winner"),
+            questions_asked=record.get("questions_asked", len(questions)),
+        )
+
+
+def load_recorded_games(path: str) -> Iterator[RecordedGame]:
+    """Stream recorded games from a JSON Lines file of game results or game events.
+
+    Result records (game_results.jsonl, tournament games.jsonl) hold a whole game each; event
+    records (game_events.jsonl, tournament events.jsonl) are grouped by game id and a game is
+    yielded once its 'game_over' event is read.
+
+    Args:
+        path: Path of the JSON Lines file
+
+    Yields:
+        RecordedGame: One finished game at a time
+    """
+    in_progress: Dict[str, RecordedGame] = {}
+    for record in read_jsonl(path):
+        event = record.get("event")
+        if event is None:
+            if record.get("topic") is not None:
+                yield RecordedGame.from_result(record)
+            continue
+
+        game_id = record["game_id"]
+        if event == "game_start":
+            in_progress[game_id] = RecordedGame(game_id=game_id, topic=record["topic"])
+        elif game_id not in in_progress:
+            continue
+        elif event == "turn":
+            in_progress[game_id].questions.append(record["question"])
+            in_progress[game_id].answers.append(record["answer"])
+        elif event == "forfeit":
+            in_progress[game_id].forfeited_turns.append(record["turn"])
+        elif event == "game_over":
+            game = in_progress.pop(game_id)
+            game.winner = record["winner"]
+            game.questions_asked = record["questions_asked"]
+            yield game
+
+
+class ReplayBackend:
+    """LLM backend answering from a recorded game instead of a model.
+
+    Guesser requests get the recorded turns in order, one per request: the recorded question,
+    or an empty (invalid) response for a forfeited turn. Host requests get the recorded answer
+    to the question asked ('no' for a question that was never recorded).
+    """
+
+    def __init__(self, game: RecordedGame):
+        self.answers = {question: answer for question, answer in zip(game.questions, game.answers)}
+        questions = iter(game.questions)
+        forfeited_turns = set(game.forfeited_turns)
+        self.turns: List[Optional[str]] = [
+            None if turn in forfeited_turns else next(questions)
+            for turn in range(1, len(game.questions) + len(forfeited_turns) + 1)
+        ]
+        self.calls = 0
+        self.questions_offered = 0
+
+    def _respond(self, prompt: Union[str, Prompt]) -> str:
+        self.calls += 1
+        host_question = _HOST_QUESTION_PATTERN.search(render_prompt(prompt))
+        if host_question:
+            return "yes" if self.answers.get(host_question.group(1).strip()) else "no"
+        if self.questions_offered >= len(self.turns):
+            return ""
+        self.questions_offered += 1
+        return self.turns[self.questions_offered - 1] or ""
+
+    def complete(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> LLMResponse:
+        """Return the recorded response for the prompt."""
+        return LLMResponse(self._respond(prompt))
+
+    async def complete_async(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> LLMResponse:
+        """Asynchronous version of complete."""
+        return LLMResponse(self._respond(prompt))
+
+    def stream(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> Iterator[LLMResponse]:
+        """Yield the recorded response as a single chunk."""
+        yield LLMResponse(self._respond(prompt))
+
+    async def stream_async(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> AsyncIterator[LLMResponse]:
+        """Asynchronous version of stream."""
+        yield LLMResponse(self._respond(prompt))
+
+
+@dataclass
+class ReplayResult:
+    """Recorded versus replayed outcome of one game."""
+
+    game_id: Optional[str]
+    topic: str
+    recorded_winner: Optional[str]
+    replayed_winner: Optional[str]
+    recorded_questions_asked: int
+    replayed_questions_asked: int
+    rejected_questions: List[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        """Whether the current game logic reaches a different outcome."""
+        return (
+            self.recorded_winner != self.replayed_winner
+            or self.recorded_questions_asked != self.replayed_questions_asked
+        )
+
+
+def replay_game(game: RecordedGame, max_questions: int = 20) -> ReplayResult:
+    """Replay one recorded game through the current manager, validator and win detection.
+
+    Each recorded turn is offered once: forfeited turns are forfeited again, and a recorded
+    question the current validator rejects forfeits its turn, as it would have in a live game.
+
+    Args:
+        game: The recorded game
+        max_questions: Maximum number of questions per game
+
+    Returns:
+        ReplayResult: The recorded and replayed outcomes
+    """
+    backend = ReplayBackend(game)
+    llm = LLMInterface(backend=backend)
+    host = HostAgent(name="ReplayHost", role="host", llm=llm)
+    guesser = GuesserAgent(name="ReplayGuesser", role="guesser", llm=llm)
+    game_manager = SingleGameManager(host, guesser, max_questions=max_questions, max_attempts=1)
+    game_manager.game_state = GameState(game.topic, game_id=game.game_id)
+
+    rejected_questions = []
+    while not game_manager.game_state.game_over:
+        offered_before = backend.questions_offered
+        asked_before = len(game_manager.game_state.previous_questions)
+        game_manager.play_turn()
+        if (
+            backend.questions_offered > offered_before
+            and backend.turns[offered_before] is not None
+            and len(game_manager.game_state.previous_questions) == asked_before
+        ):
+            rejected_questions.append(backend.turns[offered_before])
+
+    return ReplayResult(
+        game_id=game.game_id,
+        topic=game.topic,
+        recorded_winner=game.winner,
+        replayed_winner=game_manager.game_state.winner,
+        recorded_questions_asked=game.questions_asked,
+        replayed_questions_asked=game_manager.game_state.questions_asked,
+        rejected_questions=rejected_questions,
+    )
+
+
+def replay_games(
+    games: Iterable[RecordedGame], max_questions: int = 20, report: Optional[JsonlLogWriter] = None
+) -> dict:
+    """Replay many recorded games and summarise how their outcomes changed.
+
+    Args:
+        games: Recorded games, e.g. from load_recorded_games
+        max_questions: Maximum number of questions per game
+        report: Optional JSON Lines writer receiving one ReplayResult per game
+
+    Returns:
+        dict: Counts of replayed, changed and flipped games, rejected questions and throughput
+    """
+    summary = {
+        "games": 0,
+        "changed": 0,
+        "guesser_to_host": 0,
+        "host_to_guesser": 0,
+        "rejected_questions": 0,
+    }
+    started = time.perf_counter()
+    # The game managers print every turn; replays should run at CPU speed
+    with contextlib.redirect_stdout(io.StringIO()):
+        for game in games:
+            result = replay_game(game, max_questions)
+            summary["games"] += 1
+            summary["changed"] += result.changed
+            summary["guesser_to_host"] += (
+                result.recorded_winner == "guesser" and result.replayed_winner == "host"
+            )
+            summary["host_to_guesser"] += (
+                result.recorded_winner == "host" and result.replayed_winner == "guesser"
+            )
+            summary["rejected_questions"] += len(result.rejected_questions)
+            if report is not None:
+                report.write({**asdict(result), "changed": result.changed})
+    summary["wall_time_seconds"] = time.perf_counter() - started
+    summary["games_per_second"] = (
+        summary["games"] / summary["wall_time_seconds"] if summary["wall_time_seconds"] else 0.0
+    )
+    return summary
+
+
+def main():
+    """Command line entry point for replay runs."""
+    parser = argparse.ArgumentParser(description="Re-score recorded games with the current game logic")
+    parser.add_argument("paths", nargs="+", help="JSON Lines files of game results or game events")
+    parser.add_argument("--max-questions", type=int, default=20)
+    parser.add_argument(
+        "--output", default=None, help="write one replay result per game to this JSON Lines file"
+    )
+    args = parser.parse_args()
+
+    games = (game for path in args.paths for game in load_recorded_games(path))
+    if args.output:
+        with JsonlLogWriter(args.output) as report:
+            summary = replay_games(games, args.max_questions, report)
+    else:
+        summary = replay_games(games, args.max_questions)
+    print(
+        f"Replayed {summary['games']} games in {summary['wall_time_seconds']:.2f}s "
+        f"({summary['games_per_second']:.0f} games/s)"
+    )
+    print(
+        f"Changed outcomes: {summary['changed']} (guesser->host {summary['guesser_to_host']}, "
+        f"host->guesser {summary['host_to_guesser']}), rejected questions: {summary['rejected_questions']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,517 @@
+"""Asyncio HTTP server hosting many concurrent 20 questions game sessions.
+
+All sessions run on one event loop and share the LLM interface (and its connection pool
+and rate limits), the host answer cache and the topic catalog. Run e.g.:
+    python server.py --port 8080 --config config.json
+
+Endpoints (JSON in and out):
+    POST   /sessions            create a session and start its game; the body may override
+                                game settings such as game_mode, num_agents or max_questions
+    POST   /sessions/<id>/turn  play one turn
+    GET    /sessions/<id>       session state and history
+    DELETE /sessions/<id>       end a session
+    GET    /metrics             session counts, turn throughput and latency percentiles
+"""
+# pylint: disable-msg=C0301,R0902,R0903,R0911,R0913,W0718
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import deque
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+
+from cache import AnswerCache
+from game_manager import FAN_OUT_MODES, SPECULATION_MODES, BaseGameManager
+from llm import LLMInterface
+from main import (
+    build_answer_cache,
+    build_game_manager,
+    build_llm,
+    build_topic_catalog,
+    load_config,
+    topic_seed,
+)
+from topics import TopicCatalog
+from tracing import percentile
+
+# Game settings a client may override per session
+SESSION_OPTIONS = (
+    "game_mode",
+    "num_agents",
+    "max_questions",
+    "speculation",
+    "num_candidates",
+    "max_question_attempts",
+    "fan_out",
+    "guesser_strategy",
+)
+
+# Inclusive bounds of the integer session options
+SESSION_OPTION_RANGES = {
+    "num_agents": (1, 16),
+    "max_questions": (1, 100),
+    "num_candidates": (1, 10),
+    "max_question_attempts": (1, 10),
+}
+
+# Allowed values of the other session options; except for the required game_mode, the first is the default
+SESSION_OPTION_CHOICES = {
+    "game_mode": ("single", "multiple"),
+    "speculation": SPECULATION_MODES,
+    "fan_out": FAN_OUT_MODES,
+    "guesser_strategy": (None, "information_gain"),
+}
+
+_MAX_BODY_BYTES = 64 * 1024
+_MAX_HEADERS = 100
+
+
+def validate_session_config(config: dict, has_topic_catalog: bool = False):
+    """Check the session options of a game configuration before any game is built.
+
+    Args:
+        config: Base configuration merged with the client's overrides
+        has_topic_catalog: Whether a topic catalog is loaded, which guesser strategies need
+
+    Raises:
+        ValueError: On a missing or out of range option
+    """
+    if "game_mode" not in config:
+        raise ValueError("game_mode is required")
+    for option, (low, high) in SESSION_OPTION_RANGES.items():
+        value = config.get(option)
+        if value is None or (option == "num_agents" and config["game_mode"] != "multiple"):
+            continue
+        if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+            raise ValueError(f"{option} must be an integer between {low} and {high}, got {value!r}")
+    for option, choices in SESSION_OPTION_CHOICES.items():
+        value = config.get(option, choices[0])
+        if value not in choices:
+            raise ValueError(f"{option} must be one of {list(choices)}, got {value!r}")
+    if config["game_mode"] == "multiple" and config.get("num_agents") is None:
+        raise ValueError("num_agents is required in multiple mode")
+    if config.get("guesser_strategy") is not None and not has_topic_catalog:
+        raise ValueError("guesser_strategy requires a topic catalog")
+
+
+class GameSession:
+    """One hosted game: its manager, a lock serialising its turns and its activity times."""
+
+    def __init__(self, session_id: str, game_manager: BaseGameManager):
+        self.session_id = session_id
+        self.game_manager = game_manager
+        self.lock = asyncio.Lock()
+        self.created = time.monotonic()
+        self.last_active = self.created
+
+    def to_dict(self) -> dict:
+        """Public view of the session; the topic is only revealed once the game is over."""
+        game_state = self.game_manager.game_state
+        return {
+            "session_id": self.session_id,
+            "game_id": game_state.game_id,
+            "questions_asked": game_state.questions_asked,
+            "max_questions": self.game_manager.max_questions,
+            "questions": game_state.previous_questions,
+            "answers": list(game_state.previous_answers),
+            "game_over": game_state.game_over,
+            "winner": game_state.winner,
+            "topic": game_state.topic if game_state.game_over else None,
+        }
+
+
+class SessionServer:
+    """Hosts game sessions in memory behind a small HTTP/1.1 JSON API.
+
+    Sessions idle for longer than `session_ttl` seconds are evicted by a background task, and
+    connections sending nothing for `read_timeout` seconds are closed.
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        llm: Optional[LLMInterface] = None,
+        answer_cache: Optional[AnswerCache] = None,
+        topic_catalog: Optional[TopicCatalog] = None,
+        session_ttl: float = 600.0,
+        max_sessions: int = 10000,
+        latency_window: int = 10000,
+        read_timeout: float = 30.0,
+    ):
+        """Initialize the server.
+
+        Args:
+            config: Base game configuration for new sessions
+            llm: LLM interface shared by all sessions, created from the config when omitted
+            answer_cache: Host answer cache shared by all sessions, created from the config when omitted
+            topic_catalog: Topic catalog shared by all sessions, loaded from the config when omitted
+            session_ttl: Seconds of inactivity after which a session is evicted
+            max_sessions: Maximum sessions held at once; creating more fails with 503
+            latency_window: Number of recent turn latencies kept for the metrics percentiles
+            read_timeout: Seconds to wait for each line or body of a request before closing the connection
+        """
+        self.config = config
+        self.llm = llm or build_llm(config)
+        self._owns_answer_cache = answer_cache is None
+        self.answer_cache = answer_cache if answer_cache is not None else build_answer_cache(config)
+        self.topic_catalog = topic_catalog if topic_catalog is not None else build_topic_catalog(config)
+        self.session_ttl = session_ttl
+        self.max_sessions = max_sessions
+        self.read_timeout = read_timeout
+        self.sessions: Dict[str, GameSession] = {}
+        self.counters = {
+            "sessions_created": 0,
+            "sessions_evicted": 0,
+            "sessions_deleted": 0,
+            "games_finished": 0,
+            "turns": 0,
+            "requests": 0,
+            "errors": 0,
+        }
+        self._turn_latencies: deque = deque(maxlen=latency_window)
+        self._started = time.monotonic()
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._evictor: Optional[asyncio.Task] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> int:
+        """Start listening and the idle session evictor.
+
+        Args:
+            host: Interface to bind
+            port: Port to bind, 0 for any free port
+
+        Returns:
+            int: The bound port
+        """
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self._evictor = asyncio.create_task(self._evict_idle_sessions())
+        self._started = time.monotonic()
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """Serve until cancelled."""
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening, stop the evictor, drop every session and commit the answer cache."""
+        if self._evictor is not None:
+            self._evictor.cancel()
+            await asyncio.gather(self._evictor, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.sessions.clear()
+        if self.answer_cache is not None:
+            if self._owns_answer_cache:
+                self.answer_cache.close()
+            else:
+                self.answer_cache.flush()
+
+    async def _evict_idle_sessions(self):
+        while True:
+            await asyncio.sleep(min(self.session_ttl, 30.0))
+            self.evict_idle_sessions()
+
+    def evict_idle_sessions(self) -> int:
+        """Drop sessions idle for longer than session_ttl.
+
+        Returns:
+            int: Number of evicted sessions
+        """
+        deadline = time.monotonic() - self.session_ttl
+        idle = [
+            session_id
+            for session_id, session in self.sessions.items()
+            if session.last_active < deadline and not session.lock.locked()
+        ]
+        for session_id in idle:
+            del self.sessions[session_id]
+        self.counters["sessions_evicted"] += len(idle)
+        return len(idle)
+
+    async def create_session(self, options: dict) -> GameSession:
+        """Create a session and start its game.
+
+        Args:
+            options: Per-session overrides of SESSION_OPTIONS
+
+        Returns:
+            GameSession: The new session
+
+        Raises:
+            ValueError: On unknown options or invalid option values
+        """
+        unknown = set(options) - set(SESSION_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown session options: {sorted(unknown)}")
+        config = {**self.config, **options}
+        validate_session_config(config, has_topic_catalog=self.topic_catalog is not None)
+        game_manager = build_game_manager(
+            config,
+            self.llm,
+            answer_cache=self.answer_cache,
+            topic_catalog=self.topic_catalog,
+            seed=topic_seed(config, self.counters["sessions_created"]),
+        )
+        await game_manager.start_game_async()
+        session = GameSession(uuid.uuid4().hex, game_manager)
+        self.sessions[session.session_id] = session
+        self.counters["sessions_created"] += 1
+        return session
+
+    async def play_turn(self, session: GameSession) -> dict:
+        """Play one turn of a session's game; turns of one session never overlap."""
+        async with session.lock:
+            if session.game_manager.game_state.game_over:
+                return {**session.to_dict(), "message": "Game already over"}
+            started = time.perf_counter()
+            _, message = await session.game_manager.play_turn_async()
+            self._turn_latencies.append(time.perf_counter() - started)
+            self.counters["turns"] += 1
+            if session.game_manager.game_state.game_over:
+                self.counters["games_finished"] += 1
+                if self.answer_cache is not None:
+                    self.answer_cache.flush()
+            session.last_active = time.monotonic()
+        return {**session.to_dict(), "message": message}
+
+    def metrics(self) -> dict:
+        """Session counts, turn throughput and turn latency percentiles."""
+        uptime = time.monotonic() - self._started
+        metrics = {
+            **self.counters,
+            "sessions_active": len(self.sessions),
+            "uptime_seconds": uptime,
+            "turns_per_second": self.counters["turns"] / uptime if uptime else 0.0,
+            "games_per_minute": self.counters["games_finished"] / uptime * 60 if uptime else 0.0,
+            "turn_latency_p50_ms": percentile(self._turn_latencies, 0.50) * 1000,
+            "turn_latency_p95_ms": percentile(self._turn_latencies, 0.95) * 1000,
+            "turn_latency_p99_ms": percentile(self._turn_latencies, 0.99) * 1000,
+            "llm_retries": self.llm.scheduler.retries,
+            "llm_rate_limited": self.llm.scheduler.rate_limited,
+        }
+        if self.answer_cache is not None:
+            metrics["answer_cache"] = self.answer_cache.stats()
+        if self.topic_catalog is not None:
+            metrics["topic_catalog"] = self.topic_catalog.stats()
+        return metrics
+
+    async def handle_request(self, method: str, path: str, body: Optional[dict]) -> Tuple[int, dict]:
+        """Route one API request.
+
+        Args:
+            method: HTTP method
+            path: Request path without query string
+            body: Parsed JSON body, if any
+
+        Returns:
+            Tuple[int, dict]: HTTP status and JSON response
+        """
+        parts = [part for part in path.split("/") if part]
+        if parts == ["metrics"] and method == "GET":
+            return HTTPStatus.OK, self.metrics()
+        if parts == ["sessions"] and method == "POST":
+            if len(self.sessions) >= self.max_sessions:
+                self.evict_idle_sessions()
+                if len(self.sessions) >= self.max_sessions:
+                    return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Too many sessions"}
+            try:
+                session = await self.create_session(body or {})
+            except (ValueError, KeyError, TypeError) as exception:
+                return HTTPStatus.BAD_REQUEST, {"error": str(exception)}
+            return HTTPStatus.CREATED, session.to_dict()
+        if len(parts) in (2, 3) and parts[0] == "sessions":
+            session = self.sessions.get(parts[1])
+            if session is None:
+                return HTTPStatus.NOT_FOUND, {"error": f"Unknown session {parts[1]}"}
+            session.last_active = time.monotonic()
+            if len(parts) == 3 and parts[2] == "turn" and method == "POST":
+                return HTTPStatus.OK, await self.play_turn(session)
+            if len(parts) == 2 and method == "GET":
+                return HTTPStatus.OK, session.to_dict()
+            if len(parts) == 2 and method == "DELETE":
+                del self.sessions[parts[1]]
+                self.counters["sessions_deleted"] += 1
+                return HTTPStatus.OK, session.to_dict()
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"{method} not allowed on {path}"}
+        return HTTPStatus.NOT_FOUND, {"error": f"Unknown path {path}"}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve HTTP/1.1 requests on one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.read_timeout)
+                except asyncio.TimeoutError:
+                    # Idle keep-alive connection
+                    break
+                except ValueError:
+                    # Longer than the stream limit
+                    await self._respond(
+                        writer, HTTPStatus.BAD_REQUEST, {"error": "Request line too long"}, False
+                    )
+                    break
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(
+                        writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}, False
+                    )
+                    break
+
+                try:
+                    headers = await asyncio.wait_for(self._read_headers(reader), self.read_timeout)
+                except asyncio.TimeoutError:
+                    await self._respond(
+                        writer, HTTPStatus.REQUEST_TIMEOUT, {"error": "Request timeout"}, False
+                    )
+                    break
+                except ValueError:
+                    await self._respond(
+                        writer,
+                        HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                        {"error": "Request headers too large"},
+                        False,
+                    )
+                    break
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    if version == "HTTP/1.1"
+                    else headers.get("connection", "").lower() == "keep-alive"
+                )
+
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # Without a usable length the next request on the connection cannot be found
+                    await self._respond(
+                        writer, HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}, False
+                    )
+                    break
+                if length > _MAX_BODY_BYTES:
+                    await self._respond(
+                        writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body too large"}, False
+                    )
+                    break
+                body = None
+                if length:
+                    try:
+                        payload = await asyncio.wait_for(reader.readexactly(length), self.read_timeout)
+                    except asyncio.TimeoutError:
+                        await self._respond(
+                            writer, HTTPStatus.REQUEST_TIMEOUT, {"error": "Request timeout"}, False
+                        )
+                        break
+                    try:
+                        body = json.loads(payload)
+                    except ValueError:
+                        # Invalid JSON or invalid UTF-8
+                        await self._respond(
+                            writer, HTTPStatus.BAD_REQUEST, {"error": "Invalid JSON body"}, keep_alive
+                        )
+                        continue
+                    if not isinstance(body, dict):
+                        await self._respond(
+                            writer, HTTPStatus.BAD_REQUEST, {"error": "Body must be an object"}, keep_alive
+                        )
+                        continue
+
+                self.counters["requests"] += 1
+                try:
+                    status, response = await self.handle_request(method, target.split("?", 1)[0], body)
+                except Exception as exception:
+                    status, response = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exception)}
+                if status >= 500:
+                    self.counters["errors"] += 1
+                await self._respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+        """Read header lines up to the blank line ending them.
+
+        Raises:
+            ValueError: On a header line longer than the stream limit or too many headers
+        """
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            if len(headers) >= _MAX_HEADERS:
+                raise ValueError("Too many headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, response: dict, keep_alive: bool):
+        payload = json.dumps(response).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {int(status)} {HTTPStatus(status).phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + payload)
+        await writer.drain()
+
+
+async def serve(
+    config: dict, host: str, port: int, session_ttl: float, max_sessions: int, read_timeout: float = 30.0
+):
+    """Run a session server until cancelled."""
+    server = SessionServer(
+        config, session_ttl=session_ttl, max_sessions=max_sessions, read_timeout=read_timeout
+    )
+    bound_port = await server.start(host, port)
+    print(f"Serving 20 questions sessions on http://{host}:{bound_port}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    """Command line entry point for the session server."""
+    parser = argparse.ArgumentParser(description="Serve 20 questions game sessions over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--config", default="config.json", help="path to the base game config")
+    parser.add_argument(
+        "--session-ttl", type=float, default=600.0, help="idle seconds before a session is evicted"
+    )
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument(
+        "--read-timeout", type=float, default=30.0, help="seconds to wait for a request before closing"
+    )
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(
+            serve(
+                load_config(args.config),
+                args.host,
+                args.port,
+                args.session_ttl,
+                args.max_sessions,
+                args.read_timeout,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
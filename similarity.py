@@ -0,0 +1,104 @@
+"""Module containing the incremental near-duplicate index used to reject repeated questions."""
+# pylint: disable-msg=C0301
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from text import normalize_question
+
+# Words that carry no meaning for telling two yes/no questions apart
+STOPWORDS = frozenset(
+    "a an the is it its it's this that these those be been being am are was were do does did can could will "
+    "would should shall may might must has have had you your i me my we our they them of in on at to for from "
+    "with by as or and if so any some something".split()
+)
+
+
+def question_shingles(question: str) -> FrozenSet[str]:
+    """Token shingles of a question: its content words plus adjacent content-word pairs.
+
+    Args:
+        question: Raw question text
+
+    Returns:
+        The set of shingles describing the question
+    """
+    words = []
+    for word in normalize_question(question).split():
+        if word in STOPWORDS:
+            continue
+        # Crude plural folding so 'animals' and 'animal' share a shingle
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return frozenset(words + [f"{first} {second}" for first, second in zip(words, words[1:])])
+
+
+class QuestionIndex:
+    """Inverted index over the shingles of previously asked questions.
+
+    Adding a question only appends to the postings of its own shingles, and a lookup only visits
+    the postings of the candidate's shingles, so checking a new question never rescans or
+    renormalizes the history.
+    """
+
+    __slots__ = ("questions", "_postings", "_sizes", "_exact")
+
+    def __init__(self, questions: Optional[Iterable[str]] = None):
+        self.questions: List[str] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._sizes: List[int] = []
+        self._exact: Dict[str, int] = {}
+        for question in questions or ():
+            self.add(question)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def add(self, question: str):
+        """Index one more asked question.
+
+        Args:
+            question: The question that was asked
+        """
+        question_id = len(self.questions)
+        shingles = question_shingles(question)
+        self.questions.append(question)
+        self._sizes.append(len(shingles))
+        self._exact.setdefault(normalize_question(question), question_id)
+        for shingle in shingles:
+            self._postings.setdefault(shingle, []).append(question_id)
+
+    def find_exact(self, question: str) -> Optional[str]:
+        """Return the previous question equal to this one after normalization, if any."""
+        question_id = self._exact.get(normalize_question(question))
+        return self.questions[question_id] if question_id is not None else None
+
+    def most_similar(self, question: str) -> Tuple[Optional[str], float]:
+        """Find the previous question with the highest Jaccard similarity of shingles.
+
+        Args:
+            question: Candidate question
+
+        Returns:
+            Tuple of (most similar previous question or None, similarity in [0, 1])
+        """
+        shingles = question_shingles(question)
+        overlaps: Dict[int, int] = {}
+        for shingle in shingles:
+            for question_id in self._postings.get(shingle, ()):
+                overlaps[question_id] = overlaps.get(question_id, 0) + 1
+
+        best_id, best_score = None, 0.0
+        for question_id, overlap in overlaps.items():
+            score = overlap / (len(shingles) + self._sizes[question_id] - overlap)
+            if score > best_score:
+                best_id, best_score = question_id, score
+        return (self.questions[best_id] if best_id is not None else None), best_score
+
+    def copy(self) -> "QuestionIndex":
+        """Independent copy of the index."""
+        duplicate = QuestionIndex()
+        duplicate.questions = list(self.questions)
+        duplicate._postings = {shingle: list(ids) for shingle, ids in self._postings.items()}
+        duplicate._sizes = list(self._sizes)
+        duplicate._exact = dict(self._exact)
+        return duplicate
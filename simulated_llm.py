@@ -0,0 +1,298 @@
+"""Module containing a deterministic, offline LLM backend for load testing the game engine."""
+# pylint: disable-msg=C0301,R0902,R0903,R0913
+import asyncio
+import itertools
+import math
+import random
+import re
+import time
+import zlib
+from typing import AsyncIterator, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from llm import LLMResponse, Prompt, render_prompt
+from validator import extract_guess
+
+# Generic questions the simulated guesser walks through, in order
+QUESTION_BANK = (
+    "Is it a physical object?",
+    "Is it alive?",
+    "Can you hold it in your hand?",
+    "Is it larger than a person?",
+    "Is it man-made?",
+    "Is it found in a typical home?",
+    "Is it used outdoors?",
+    "Is it a piece of equipment or machinery?",
+    "Does it use electricity?",
+    "Is it used for entertainment?",
+    "Is it related to science?",
+    "Is it made of metal?",
+    "Is it used for transportation?",
+    "Is it expensive?",
+    "Is it found in an office?",
+    "Is it a type of computer?",
+    "Is it used by scientists?",
+    "Is it something most people own?",
+    "Is it older than 100 years?",
+    "Does it need special training to use?",
+)
+
+_TOPIC_PATTERN = re.compile(r"secret topic is '([^']+)'")
+_QUESTION_PATTERN = re.compile(r"Question: (.+)")
+_HISTORY_PATTERN = re.compile(r"^\s*Q: ", re.MULTILINE)
+_CANDIDATES_PATTERN = re.compile(r"Generate the (\d+) best next")
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+# Block boundaries before a breakpoint the real API checks for cached prefixes
+_CACHE_LOOKBACK_BLOCKS = 20
+
+
+class SimulatedAPIError(Exception):
+    """Injected API failure carrying an HTTP status and retry-after header like a real API error."""
+
+    class _Response:
+        def __init__(self, headers: dict):
+            self.headers = headers
+
+    def __init__(self, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(f"Simulated API error {status_code}")
+        self.status_code = status_code
+        self.response = self._Response({"retry-after": str(retry_after)} if retry_after is not None else {})
+
+
+class SimulatedBackend:
+    """Offline LLM backend with configurable latency, failure injection and rule-based answers.
+
+    Host prompts are answered 'yes' for a correct direct guess or a question sharing a word with
+    the topic, 'no' for a direct guess at another of `guess_topics`, otherwise with a yes/no
+    derived from a stable hash of (topic, question) that is 'yes' with probability `yes_rate`. Guesser
+    prompts get the next unasked question from QUESTION_BANK (or a numbered list of the next
+    ones for candidate pool prompts), with direct guesses from `guess_topics` mixed in. Scripted responses, when given, are returned first in order.
+    Response content depends only on the prompt and seed, so runs are reproducible.
+
+    Structured prompts get simulated prompt caching: the system and system+prefix parts are cache
+    breakpoints, and a part seen before, or a prefix cached at an earlier block boundary, is
+    reported as cache read tokens instead of input tokens.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        latency_sigma: float = 0.0,
+        token_latency: float = 0.0,
+        verbosity: int = 0,
+        error_rate: float = 0.0,
+        error_status: int = 429,
+        retry_after: Optional[float] = None,
+        yes_rate: float = 0.5,
+        guess_rate: float = 0.1,
+        guess_topics: Sequence[str] = ("Quantum supercomputer", "Laptop", "Telescope", "Robot", "Smartphone"),
+        responses: Optional[Iterable[str]] = None,
+        seed: int = 0,
+        cache_min_tokens: int = 0,
+    ):
+        """Initialize the simulated backend.
+
+        Args:
+            latency: Mean response latency in seconds
+            latency_sigma: Shape of a lognormal latency distribution, 0 for fixed latency
+            token_latency: Additional seconds per generated output word
+            verbosity: Filler words appended after each rule-based response, like a chatty model
+            error_rate: Probability that a call fails with SimulatedAPIError
+            error_status: HTTP status of injected failures (429 rate limit, 529 overload, ...)
+            retry_after: Retry-after hint in seconds attached to injected failures
+            yes_rate: Probability the host answers 'yes' to an unrelated question
+            guess_rate: Probability the guesser makes a direct guess instead of a bank question
+            guess_topics: Topics the guesser picks its direct guesses from
+            responses: Scripted responses returned in order before falling back to rules
+            seed: Seed for latency, failures and answer content
+            cache_min_tokens: Minimum length of a cacheable prompt part, like the real API's minimum
+        """
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.token_latency = token_latency
+        self.verbosity = verbosity
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.yes_rate = yes_rate
+        self.guess_rate = guess_rate
+        self.guess_topics = list(guess_topics)
+        self._guess_topic_keys = {topic.lower() for topic in self.guess_topics}
+        self.seed = seed
+        self.calls = 0
+        self.cancelled = 0
+        self.streamed_tokens = 0
+        self.errors_injected = 0
+        self.cache_min_tokens = cache_min_tokens
+        self.input_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self._cached_prefixes = set()
+        self._responses = iter(responses) if responses is not None else None
+        self._rng = random.Random(seed)
+
+    def _sample_latency(self) -> float:
+        if self.latency <= 0:
+            return 0.0
+        if self.latency_sigma <= 0:
+            return self.latency
+        # Lognormal with the configured mean
+        mu = math.log(self.latency) - self.latency_sigma**2 / 2
+        return self._rng.lognormvariate(mu, self.latency_sigma)
+
+    def _prompt_rng(self, *parts: str) -> random.Random:
+        """Random generator seeded from the prompt content so answers do not depend on call order."""
+        return random.Random(zlib.crc32("\x1f".join(parts).encode("utf-8")) ^ self.seed)
+
+    def _usage(self, prompt: Union[str, Prompt]) -> Tuple[int, int, int]:
+        """Input, cache read and cache write token counts of a prompt, updating the simulated cache.
+
+        Like the real API, the system and system+prefix breakpoints are written to the cache,
+        and a prefix breakpoint not cached yet is read from the longest cached one among the
+        previous `_CACHE_LOOKBACK_BLOCKS` prefix block boundaries.
+        """
+        if not isinstance(prompt, Prompt):
+            input_tokens = len(prompt) // 4 + 1
+            self.input_tokens += input_tokens
+            return input_tokens, 0, 0
+
+        total_tokens = len(prompt.render()) // 4 + 1
+        cache_read, cache_write = 0, 0
+        if len(prompt.system) // 4 >= self.cache_min_tokens:
+            system_key = zlib.crc32(prompt.system.encode("utf-8"))
+            if system_key in self._cached_prefixes:
+                cache_read += len(prompt.system) // 4
+            else:
+                cache_write += len(prompt.system) // 4
+                self._cached_prefixes.add(system_key)
+
+            boundaries = list(itertools.accumulate(prompt.prefix_blocks()))
+            if boundaries and len(prompt.system + boundaries[-1]) // 4 >= self.cache_min_tokens:
+                cached = ""
+                for boundary in reversed(boundaries[-_CACHE_LOOKBACK_BLOCKS:]):
+                    if zlib.crc32((prompt.system + "\n" + boundary).encode("utf-8")) in self._cached_prefixes:
+                        cached = boundary
+                        break
+                cache_read += len(cached) // 4
+                cache_write += (len(boundaries[-1]) - len(cached)) // 4
+                self._cached_prefixes.add(zlib.crc32((prompt.system + "\n" + boundaries[-1]).encode("utf-8")))
+        input_tokens = max(1, total_tokens - cache_read - cache_write)
+        self.input_tokens += input_tokens
+        self.cache_read_tokens += cache_read
+        self.cache_write_tokens += cache_write
+        return input_tokens, cache_read, cache_write
+
+    def _next_scripted(self) -> Optional[str]:
+        if self._responses is None:
+            return None
+        return next(self._responses, None)
+
+    def _answer_as_host(self, topic: str, question: str) -> str:
+        normalized_question = question.lower().strip()
+        # The pattern also matches attribute questions such as 'Is it alive?', so only a guess
+        # naming the topic or another known topic is answered as a guess
+        guessed_topic = extract_guess(normalized_question)
+        if guessed_topic == topic.lower():
+            return "yes"
+        if set(_WORD_PATTERN.findall(topic.lower())) & set(_WORD_PATTERN.findall(normalized_question)):
+            return "yes"
+        if guessed_topic in self._guess_topic_keys:
+            return "no"
+        return (
+            "yes" if self._prompt_rng(topic.lower(), normalized_question).random() < self.yes_rate else "no"
+        )
+
+    def _ask_as_guesser(self, prompt: str) -> str:
+        asked = len(_HISTORY_PATTERN.findall(prompt))
+        rng = self._prompt_rng(prompt)
+        candidates = _CANDIDATES_PATTERN.search(prompt)
+        if candidates:
+            count = int(candidates.group(1))
+            questions = [QUESTION_BANK[(asked + offset) % len(QUESTION_BANK)] for offset in range(count)]
+            if self.guess_topics and rng.random() < self.guess_rate:
+                questions.insert(0, f"Is it a {rng.choice(self.guess_topics)}?")
+            return "\n".join(
+                f"{rank}. {question}" for rank, question in enumerate(questions[:count], start=1)
+            )
+        if self.guess_topics and (asked >= len(QUESTION_BANK) or rng.random() < self.guess_rate):
+            return f"Is it a {rng.choice(self.guess_topics)}?"
+        return QUESTION_BANK[asked % len(QUESTION_BANK)]
+
+    def _respond(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str]
+    ) -> List[str]:
+        """Produce the response as a list of word chunks (each carrying its leading whitespace)."""
+        prompt = render_prompt(prompt)
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors_injected += 1
+            raise SimulatedAPIError(self.error_status, self.retry_after)
+
+        text = self._next_scripted()
+        if text is None:
+            # The last topic mention is the real one; host instructions include an example topic
+            topics = _TOPIC_PATTERN.findall(prompt)
+            question = _QUESTION_PATTERN.search(prompt)
+            if topics and question:
+                text = self._answer_as_host(topics[-1], question.group(1).strip())
+            else:
+                text = self._ask_as_guesser(prompt)
+            if self.verbosity:
+                text += "\n" + " ".join(["Let me explain my reasoning."] * ((self.verbosity + 4) // 5))
+
+        for stop_sequence in stop_sequences:
+            if stop_sequence in text:
+                text = text[: text.index(stop_sequence)]
+        return re.findall(r"\s*\S+", text)[:max_tokens]
+
+    def complete(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> LLMResponse:
+        """Simulate one request, blocking for the sampled latency and every generated word."""
+        self.calls += 1
+        time.sleep(self._sample_latency())
+        words = self._respond(prompt, max_tokens, stop_sequences)
+        time.sleep(self.token_latency * len(words))
+        input_tokens, cache_read, cache_write = self._usage(prompt)
+        return LLMResponse("".join(words), input_tokens, len(words), cache_read, cache_write)
+
+    async def complete_async(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> LLMResponse:
+        """Simulate one request, awaiting the latency so it can be cancelled in flight."""
+        self.calls += 1
+        try:
+            await asyncio.sleep(self._sample_latency())
+            words = self._respond(prompt, max_tokens, stop_sequences)
+            await asyncio.sleep(self.token_latency * len(words))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        input_tokens, cache_read, cache_write = self._usage(prompt)
+        return LLMResponse("".join(words), input_tokens, len(words), cache_read, cache_write)
+
+    def stream(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> Iterator[LLMResponse]:
+        """Simulate a streamed request yielding one word per token_latency; closing it stops generation."""
+        self.calls += 1
+        input_tokens, cache_read, cache_write = self._usage(prompt)
+        time.sleep(self._sample_latency())
+        for word in self._respond(prompt, max_tokens, stop_sequences):
+            time.sleep(self.token_latency)
+            self.streamed_tokens += 1
+            yield LLMResponse(word, input_tokens, 0, cache_read, cache_write)
+
+    async def stream_async(
+        self, prompt: Union[str, Prompt], max_tokens: int, stop_sequences: Sequence[str] = ()
+    ) -> AsyncIterator[LLMResponse]:
+        """Asynchronous version of stream."""
+        self.calls += 1
+        input_tokens, cache_read, cache_write = self._usage(prompt)
+        try:
+            await asyncio.sleep(self._sample_latency())
+            for word in self._respond(prompt, max_tokens, stop_sequences):
+                await asyncio.sleep(self.token_latency)
+                self.streamed_tokens += 1
+                yield LLMResponse(word, input_tokens, 0, cache_read, cache_write)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
@@ -0,0 +1,149 @@
+"""Module containing the information gain question strategy for guessers."""
+# pylint: disable-msg=C0301
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from game_state import GameState
+from text import normalize_question
+from topics import TopicCatalog
+from validator import extract_guess
+
+
+def _entropy(count: np.ndarray) -> np.ndarray:
+    """log2 of candidate counts, 0 for empty or single candidate sets."""
+    return np.log2(np.maximum(count, 1))
+
+
+class InformationGainStrategy:
+    """Picks guesser questions from a topic catalog by expected information gain.
+
+    The catalog's attribute table is held as two boolean matrices (topics x attributes): which
+    answers are known and what they are. The candidate topics consistent with a game's yes/no
+    history are filtered vectorized, and the attribute question (or direct guess) that splits
+    the remaining candidates best is asked next. Topics with an unknown answer to a question
+    stay candidates on both branches. When no candidate is left, or no question is useful,
+    the strategy has nothing to propose and the guesser falls back to the LLM. Proposals the
+    guesser's validator rejected are remembered for the rest of the game and not ranked again.
+    """
+
+    def __init__(self, catalog: TopicCatalog):
+        """Initialize the strategy.
+
+        Args:
+            catalog: Topic catalog with the attribute table; should be the host's catalog
+        """
+        self.catalog = catalog
+        self.topics = list(catalog.topics)
+        self.attributes = list(catalog.attributes)
+        rows = [catalog.answers.get(topic, [None] * len(self.attributes)) for topic in self.topics]
+        shape = (len(self.topics), len(self.attributes))
+        known = [[value is not None for value in row] for row in rows]
+        values = [[bool(value) for value in row] for row in rows]
+        self.known = np.array(known, dtype=bool).reshape(shape)
+        self.values = np.array(values, dtype=bool).reshape(shape)
+        self._attribute_columns = {
+            normalize_question(attribute): column for column, attribute in enumerate(self.attributes)
+        }
+        self._topic_rows = {normalize_question(topic): row for row, topic in enumerate(self.topics)}
+        self._rejected_game_id: Optional[str] = None
+        self._rejected: Set[str] = set()
+
+    def _rejected_questions(self, game_state: GameState) -> Set[str]:
+        """Normalized proposals rejected in the game, which speculative branches share."""
+        if game_state.game_id != self._rejected_game_id:
+            self._rejected_game_id = game_state.game_id
+            self._rejected = set()
+        return self._rejected
+
+    def reject(self, question: str, game_state: GameState):
+        """Stop proposing a question the validator rejected.
+
+        The history only grows during a game, so a question rejected as too similar to an
+        earlier one stays rejected.
+
+        Args:
+            question: The rejected proposal
+            game_state: State of the game it was proposed in
+        """
+        self._rejected_questions(game_state).add(normalize_question(question))
+
+    def candidates(self, game_state: GameState) -> np.ndarray:
+        """Boolean mask of the topics consistent with the game's answers so far.
+
+        Args:
+            game_state: Current game state
+
+        Returns:
+            np.ndarray: One flag per catalog topic
+        """
+        mask = np.ones(len(self.topics), dtype=bool)
+        for question, answer in zip(game_state.previous_questions, game_state.previous_answers):
+            normalized_question = normalize_question(question)
+            column = self._attribute_columns.get(normalized_question)
+            if column is not None:
+                mask &= ~self.known[:, column] | (self.values[:, column] == answer)
+                continue
+            row = self._topic_rows.get(extract_guess(normalized_question))
+            if row is not None:
+                if answer:
+                    mask &= np.arange(len(self.topics)) == row
+                else:
+                    mask[row] = False
+        return mask
+
+    def rank_questions(self, game_state: GameState, limit: int = 5) -> List[Tuple[str, float]]:
+        """Rank the next questions by expected information gain over the candidate topics.
+
+        Every unasked attribute is scored at once: with n candidates of which y answer yes,
+        u are unknown and the rest answer no, the gain is log2(n) minus the expected log2 of
+        the candidates left after the answer. A direct guess at a candidate is scored the same
+        way and wins ties, since it can end the game.
+
+        Args:
+            game_state: Current game state
+            limit: Maximum number of questions returned
+
+        Returns:
+            List[Tuple[str, float]]: Questions with their gain in bits, best first; empty when no
+                candidate topic is left or no question gains information
+        """
+        mask = self.candidates(game_state)
+        count = int(mask.sum())
+        if count == 0:
+            return []
+        rejected = self._rejected_questions(game_state)
+        guesses = (self.guess_question(self.topics[row]) for row in np.flatnonzero(mask))
+        guess = next((question for question in guesses if normalize_question(question) not in rejected), None)
+        if count == 1:
+            return [(guess, 0.0)] if guess is not None else []
+
+        asked = rejected | {normalize_question(question) for question in game_state.previous_questions}
+        known = self.known[mask]
+        yes = (known & self.values[mask]).sum(axis=0)
+        unknown = count - known.sum(axis=0)
+        no = count - yes - unknown
+        # Unknown topics stay on both branches and are counted as an even split
+        probability_yes = (yes + unknown / 2) / count
+        gains = np.log2(count) - (
+            probability_yes * _entropy(yes + unknown) + (1 - probability_yes) * _entropy(no + unknown)
+        )
+
+        ranked = [
+            (self.attributes[column], float(gains[column]))
+            for column in np.argsort(-gains, kind="stable")
+            if gains[column] > 1e-9 and normalize_question(self.attributes[column]) not in asked
+        ]
+        if guess is not None:
+            guess_gain = float(np.log2(count) - (count - 1) / count * np.log2(count - 1))
+            position = next(
+                (index for index, (_, gain) in enumerate(ranked) if gain <= guess_gain), len(ranked)
+            )
+            ranked.insert(position, (guess, guess_gain))
+        return ranked[:limit]
+
+    @staticmethod
+    def guess_question(topic: str) -> str:
+        """Phrase a direct guess at a topic."""
+        article = "an" if topic[:1].lower() in "aeiou" else "a"
+        return f"Is it {article} {topic}?"
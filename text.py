@@ -0,0 +1,23 @@
+"""Module containing the question text normalization shared by caching, matching and validation."""
+# pylint: disable-msg=C0301
+import re
+
+_QUESTION_PREFIX = re.compile(r"^(?:q:\s*)+")
+_NON_WORD = re.compile(r"[^a-z0-9\s]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Normalize a question so trivially different phrasings compare equal.
+
+    Lowercases, drops leading 'Q:' markers and punctuation, and collapses whitespace.
+
+    Args:
+        question: Raw question text
+
+    Returns:
+        The normalized question
+    """
+    question = _QUESTION_PREFIX.sub("", question.lower().strip())
+    question = _NON_WORD.sub(" ", question)
+    return _WHITESPACE.sub(" ", question).strip()
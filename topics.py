@@ -0,0 +1,139 @@
+"""Module containing the topic catalog the host samples secret topics from."""
+# pylint: disable-msg=C0301
+import csv
+import random
+import threading
+from typing import Dict, List, Optional, Sequence
+
+from text import normalize_question
+from validator import extract_guess
+
+_TRUE_VALUES = {"1", "yes", "y", "true"}
+_FALSE_VALUES = {"0", "no", "n", "false"}
+
+
+def _parse_answer(value: str) -> Optional[bool]:
+    value = value.strip().lower()
+    if value in _TRUE_VALUES:
+        return True
+    if value in _FALSE_VALUES:
+        return False
+    return None
+
+
+class TopicCatalog:
+    """Pool of secret topics with optional precomputed yes/no answers to attribute questions.
+
+    Attributes are questions such as 'Is it alive?'. A question whose normalized text matches
+    an attribute, or a direct guess naming a catalog topic, is answered from the table, so the
+    host does not need the LLM for it; unknown (blank) values fall back to the LLM.
+    """
+
+    def __init__(
+        self,
+        topics: Sequence[str],
+        attributes: Sequence[str] = (),
+        answers: Optional[Dict[str, Sequence[Optional[bool]]]] = None,
+    ):
+        """Initialize the catalog.
+
+        Args:
+            topics: Topic names
+            attributes: Attribute questions, the columns of the answer table
+            answers: Per topic, one answer (or None when unknown) per attribute
+        """
+        self.topics: List[str] = list(topics)
+        self.attributes: List[str] = list(attributes)
+        self.answers: Dict[str, List[Optional[bool]]] = {
+            topic: list(values) for topic, values in (answers or {}).items()
+        }
+        self.hits = 0
+        self.misses = 0
+        self._attribute_columns = {
+            normalize_question(attribute): column for column, attribute in enumerate(attributes)
+        }
+        self._topic_keys = {normalize_question(topic) for topic in self.topics}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "TopicCatalog":
+        """Load a catalog from a CSV file.
+
+        The header is `topic` followed by one attribute question per column; each row holds a
+        topic and its answers as 1/0 (or yes/no, true/false), blank when unknown.
+
+        Args:
+            path: Path of the CSV file
+
+        Returns:
+            TopicCatalog: The loaded catalog
+        """
+        with open(path, encoding="utf-8", newline="") as catalog_file:
+            reader = csv.reader(catalog_file)
+            header = next(reader)
+            attributes = header[1:]
+            topics, answers = [], {}
+            for row in reader:
+                if not row or not row[0].strip():
+                    continue
+                topic = row[0].strip()
+                topics.append(topic)
+                values = row[1 : len(attributes) + 1]
+                answers[topic] = [_parse_answer(value) for value in values] + [None] * (
+                    len(attributes) - len(values)
+                )
+        return cls(topics, attributes, answers)
+
+    def __len__(self) -> int:
+        return len(self.topics)
+
+    def sample(self, rng: random.Random) -> str:
+        """Pick a topic uniformly at random.
+
+        Args:
+            rng: Random generator, seeded by the caller for reproducible runs
+
+        Returns:
+            str: The topic
+        """
+        return rng.choice(self.topics)
+
+    def lookup(self, topic: str, question: str) -> Optional[bool]:
+        """Answer a question about a topic from the precomputed table.
+
+        Args:
+            topic: The secret topic
+            question: The question asked
+
+        Returns:
+            Optional[bool]: The answer, or None when the table does not know it
+        """
+        normalized_question = normalize_question(question)
+        answer = None
+        guess = extract_guess(normalized_question)
+        if guess in self._topic_keys:
+            answer = guess == normalize_question(topic)
+        else:
+            column = self._attribute_columns.get(normalized_question)
+            row = self.answers.get(topic)
+            if column is not None and row is not None:
+                answer = row[column]
+
+        with self._lock:
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return answer
+
+    def stats(self) -> dict:
+        """Topic count, attribute count and answer table hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "topics": len(self.topics),
+                "attributes": len(self.attributes),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
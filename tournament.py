@@ -0,0 +1,191 @@
+"""Module for running batches of 20 questions games concurrently for evaluation runs."""
+# pylint: disable-msg=C0301,R0903,W0718
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Optional
+
+from cache import AnswerCache
+from game_log import JsonlLogWriter, read_jsonl
+from llm import LLMInterface
+from main import (
+    build_answer_cache,
+    build_game_manager,
+    build_llm,
+    build_topic_catalog,
+    load_config,
+    run_game_async,
+    topic_seed,
+)
+from topics import TopicCatalog
+
+
+async def _play_one(
+    game_index: int,
+    config: dict,
+    llm: LLMInterface,
+    answer_cache: Optional[AnswerCache],
+    topic_catalog: Optional[TopicCatalog],
+    event_log: JsonlLogWriter,
+    game_log: JsonlLogWriter,
+    checkpoint_dir: str,
+) -> dict:
+    """Play a single tournament game, streaming its events and appending its record to the game log.
+
+    The game is checkpointed after every turn and resumed from its checkpoint when an earlier
+    run was interrupted; the checkpoint is removed once the game's record is written.
+    """
+    checkpoint_path = os.path.join(checkpoint_dir, f"game_{game_index:05d}.json")
+    game_manager = build_game_manager(
+        config,
+        llm,
+        answer_cache=answer_cache,
+        log_writer=event_log,
+        checkpoint_path=checkpoint_path,
+        topic_catalog=topic_catalog,
+        seed=topic_seed(config, game_index),
+    )
+    started = time.perf_counter()
+    try:
+        record = await run_game_async(
+            game_manager, checkpoint_path if os.path.exists(checkpoint_path) else None
+        )
+    except Exception as exception:
+        record = {"winner": None, "error": str(exception)}
+    record["game_index"] = game_index
+    record["duration_seconds"] = time.perf_counter() - started
+    record["trace_summary"] = game_manager.game_state.trace.summary()
+    if game_manager.speculation:
+        record["speculation"] = dict(game_manager.speculation_stats)
+    if getattr(game_manager, "fan_out", None) == "adaptive":
+        record["hedging"] = dict(game_manager.hedge_stats)
+
+    record.setdefault("game_id", game_manager.game_state.game_id)
+    game_log.write(record)
+    if answer_cache is not None:
+        # Commit the game's answers rather than keeping the write transaction open
+        answer_cache.flush()
+    if "error" not in record and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return record
+
+
+async def run_tournament(
+    config: dict,
+    num_games: int,
+    max_concurrent_games: int = 8,
+    output_dir: Optional[str] = None,
+    llm: Optional[LLMInterface] = None,
+    answer_cache: Optional[AnswerCache] = None,
+    topic_catalog: Optional[TopicCatalog] = None,
+) -> dict:
+    """Play many games concurrently on one event loop and summarise the run.
+
+    Every game runs as a task on the calling event loop through the async game manager API,
+    with a semaphore bounding how many are in flight. All games share one LLMInterface and
+    therefore one connection pool.
+    Running again with the output_dir of an interrupted run skips the games already recorded
+    and resumes unfinished ones from their checkpoints.
+
+    Args:
+        config: Game configuration shared by every game
+        num_games: Number of games to play
+        max_concurrent_games: Upper bound on games in flight at once
+        output_dir: Directory receiving events.jsonl (turn events of every game as they happen),
+            games.jsonl (one record per finished game) and summary.json
+        llm: LLM interface to share, created from the config when omitted
+        answer_cache: Host answer cache to share, created from the config when omitted
+        topic_catalog: Topic catalog to share, loaded from the config when omitted; with a
+            "topics" seed, game i samples its topic with seed + i
+
+    Returns:
+        dict: Run summary with win counts, wall time and games/minute
+    """
+    if llm is None:
+        llm = build_llm(config)
+    owns_answer_cache = answer_cache is None
+    if owns_answer_cache:
+        answer_cache = build_answer_cache(config)
+    if topic_catalog is None:
+        topic_catalog = build_topic_catalog(config)
+    if output_dir is None:
+        output_dir = os.path.join("output", "tournament", datetime.now().strftime("%Y%m%d_%H%M%S"))
+    checkpoint_dir = os.path.join(output_dir, "checkpoints")
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    games_path = os.path.join(output_dir, "games.jsonl")
+    completed = {}
+    if os.path.exists(games_path):
+        completed = {
+            record["game_index"]: record for record in read_jsonl(games_path) if "error" not in record
+        }
+
+    semaphore = asyncio.Semaphore(max_concurrent_games)
+
+    event_log = JsonlLogWriter(os.path.join(output_dir, "events.jsonl"))
+    game_log = JsonlLogWriter(games_path, flush_every=1)
+
+    with event_log, game_log:
+
+        async def play(game_index: int) -> dict:
+            async with semaphore:
+                return await _play_one(
+                    game_index, config, llm, answer_cache, topic_catalog, event_log, game_log, checkpoint_dir
+                )
+
+        started = time.perf_counter()
+        pending = [game_index for game_index in range(num_games) if game_index not in completed]
+        played = await asyncio.gather(*(play(game_index) for game_index in pending))
+        wall_time = time.perf_counter() - started
+
+    records = list(completed.values()) + played
+    summary = {
+        "num_games": num_games,
+        "max_concurrent_games": max_concurrent_games,
+        "game_mode": config["game_mode"],
+        "guesser_wins": sum(1 for record in records if record["winner"] == "guesser"),
+        "host_wins": sum(1 for record in records if record["winner"] == "host"),
+        "errors": sum(1 for record in records if "error" in record),
+        "wall_time_seconds": wall_time,
+        "games_per_minute": len(played) / wall_time * 60 if wall_time else 0.0,
+        "games_skipped": len(completed),
+        "llm_retries": llm.scheduler.retries,
+        "llm_rate_limited": llm.scheduler.rate_limited,
+    }
+    if answer_cache is not None:
+        summary["answer_cache"] = answer_cache.stats()
+        # Commit the answers still batched in the SQLite cache
+        if owns_answer_cache:
+            answer_cache.close()
+        else:
+            answer_cache.flush()
+    if topic_catalog is not None:
+        summary["topic_catalog"] = topic_catalog.stats()
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as summary_file:
+        json.dump(summary, summary_file, indent=2)
+    return summary
+
+
+def main():
+    """Command line entry point for tournament runs."""
+    parser = argparse.ArgumentParser(description="Play a batch of 20 questions games concurrently")
+    parser.add_argument("--games", type=int, default=10, help="number of games to play")
+    parser.add_argument("--concurrency", type=int, default=8, help="maximum games in flight")
+    parser.add_argument("--config", default="config.json", help="path to the game config")
+    parser.add_argument("--output-dir", default=None, help="directory for game logs and summary")
+    args = parser.parse_args()
+
+    summary = asyncio.run(
+        run_tournament(load_config(args.config), args.games, args.concurrency, output_dir=args.output_dir)
+    )
+    print(f"Played {summary['num_games']} games in {summary['wall_time_seconds']:.1f}s")
+    print(f"Throughput: {summary['games_per_minute']:.1f} games/minute")
+    print(
+        f"Guesser wins: {summary['guesser_wins']}, host wins: {summary['host_wins']}, errors: {summary['errors']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
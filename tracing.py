@@ -0,0 +1,210 @@
+"""Module containing structured tracing of game turns and LLM calls."""
+# pylint: disable-msg=C0301,R0902
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Collection, Dict, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_current_trace: ContextVar[Optional["GameTrace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def percentile(values: Collection[float], fraction: float) -> float:
+    """Nearest-rank percentile of a collection of values, 0.0 when it is empty.
+
+    Args:
+        values: Samples, e.g. latencies in seconds
+        fraction: Percentile as a fraction, e.g. 0.99
+
+    Returns:
+        float: The smallest sample at or above the requested fraction of the samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[rank]
+
+
+@dataclass
+class LLMCallRecord:
+    """Data class describing one LLM call as seen by the caller, retries included."""
+
+    agent: Optional[str]
+    role: Optional[str]
+    start: float
+    latency: float
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    retries: int = 0
+    status: str = "ok"
+
+
+@dataclass
+class Span:
+    """Data class representing a timed section of a game turn."""
+
+    name: str
+    turn: Optional[int]
+    start: float
+    duration: float = 0.0
+    attributes: Dict = field(default_factory=dict)
+    llm_calls: List[LLMCallRecord] = field(default_factory=list)
+    children: List["Span"] = field(default_factory=list)
+
+
+class GameTrace:
+    """Collects spans and LLM call records for a single game.
+
+    Spans are made current through context variables, so LLM calls made anywhere below a span,
+    including asyncio tasks and executor threads started inside it, are attributed to that span.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+
+    def now(self) -> float:
+        """Seconds elapsed since the trace was created."""
+        return time.perf_counter() - self.origin
+
+    @contextmanager
+    def span(self, name: str, turn: Optional[int] = None, **attributes) -> Iterator[Span]:
+        """Open a span nested under the current one and make it current.
+
+        Args:
+            name: Span name, e.g. 'question_generation'
+            turn: Turn number the span belongs to, inherited from the parent when omitted
+            attributes: Extra attributes recorded with the span
+        """
+        parent = _current_span.get()
+        if turn is None and parent is not None:
+            turn = parent.turn
+        new_span = Span(name=name, turn=turn, start=self.now(), attributes=attributes)
+        (parent.children if parent is not None else self.spans).append(new_span)
+
+        trace_token = _current_trace.set(self)
+        span_token = _current_span.set(new_span)
+        try:
+            yield new_span
+        finally:
+            new_span.duration = self.now() - new_span.start
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+
+    def iter_spans(self) -> Iterator[Span]:
+        """Iterate over all spans depth first."""
+        stack = list(reversed(self.spans))
+        while stack:
+            current = stack.pop()
+            yield current
+            stack.extend(reversed(current.children))
+
+    def llm_calls(self) -> List[LLMCallRecord]:
+        """All LLM call records of the game."""
+        calls = []
+        for current in self.iter_spans():
+            calls.extend(current.llm_calls)
+        return calls
+
+    def summary(self) -> dict:
+        """Aggregate call counts, tokens and time per span name and per role."""
+        calls = self.llm_calls()
+        span_time: Dict[str, float] = {}
+        for current in self.iter_spans():
+            span_time[current.name] = span_time.get(current.name, 0.0) + current.duration
+        by_role: Dict[str, dict] = {}
+        for call in calls:
+            role_totals = by_role.setdefault(
+                call.role or "unknown", {"calls": 0, "input_tokens": 0, "output_tokens": 0, "latency": 0.0}
+            )
+            role_totals["calls"] += 1
+            role_totals["input_tokens"] += call.input_tokens
+            role_totals["output_tokens"] += call.output_tokens
+            role_totals["latency"] += call.latency
+        return {
+            "llm_calls": len(calls),
+            "input_tokens": sum(call.input_tokens for call in calls),
+            "output_tokens": sum(call.output_tokens for call in calls),
+            "cache_read_tokens": sum(call.cache_read_tokens for call in calls),
+            "cache_write_tokens": sum(call.cache_write_tokens for call in calls),
+            "retries": sum(call.retries for call in calls),
+            "cancelled_calls": sum(1 for call in calls if call.status == "cancelled"),
+            "failed_calls": sum(1 for call in calls if call.status == "error"),
+            "span_time": span_time,
+            "by_role": by_role,
+        }
+
+    def to_dict(self) -> dict:
+        """Serializable representation of the trace."""
+        return {
+            "spans": [asdict(current) for current in self.spans],
+            "summary": self.summary(),
+        }
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Optional[Span]]:
+    """Open a child span on the active trace; a no-op when nothing is being traced.
+
+    Args:
+        name: Span name
+        attributes: Extra attributes recorded with the span
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    with trace.span(name, **attributes) as new_span:
+        yield new_span
+
+
+class LLMCallTracker:
+    """Measures one logical LLM call and records it on the current span when it finishes."""
+
+    def __init__(self, agent: Optional[str], role: Optional[str]):
+        self.agent = agent
+        self.role = role
+        self.attempts = 0
+        self._trace = _current_trace.get()
+        self._span = _current_span.get()
+        self._started = time.perf_counter()
+
+    def count_attempts(self, call: Callable[[], T]) -> Callable[[], T]:
+        """Wrap a request attempt so retries made by the scheduler are counted."""
+
+        def attempt() -> T:
+            self.attempts += 1
+            return call()
+
+        return attempt
+
+    def finish(self, status: str, usage=None):
+        """Record the call with its final status ('ok', 'error' or 'cancelled').
+
+        Args:
+            status: Final status of the call
+            usage: Response carrying input/output and prompt cache token counts, if any
+        """
+        if self._span is None:
+            return
+        latency = time.perf_counter() - self._started
+        self._span.llm_calls.append(
+            LLMCallRecord(
+                agent=self.agent,
+                role=self.role,
+                start=self._trace.now() - latency,
+                latency=latency,
+                input_tokens=getattr(usage, "input_tokens", 0),
+                output_tokens=getattr(usage, "output_tokens", 0),
+                cache_read_tokens=getattr(usage, "cache_read_tokens", 0),
+                cache_write_tokens=getattr(usage, "cache_write_tokens", 0),
+                retries=max(0, self.attempts - 1),
+                status=status,
+            )
+        )
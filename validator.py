@@ -1,39 +1,103 @@
 """Module for validating questions, including similarity checks and guess extraction."""
 # pylint: disable-msg=C0301,W1404
 import re
-from typing import List, Optional, Tuple
+from typing import List, Optional, Pattern, Tuple
 
 from game_state import GameState, LogType
+from similarity import QuestionIndex
+
+# Common patterns that aren't yes/no questions
+INVALID_PATTERNS = (
+    r"^what",
+    r"^how",
+    r"^who",
+    r"^where",
+    r"^when",
+    r"^why",
+    r"^which",
+    r"^can you tell",
+    r"^tell me",
+)
+
+# Patterns to identify direct guesses, each capturing the guess in its only group
+DIRECT_GUESS_PATTERNS = (
+    r"^is it (?:a |an |the )?([a-zA-Z0-9\s-]+)\??$",
+    r"^could it be (?:a |an |the )?([a-zA-Z0-9\s-]+)\??$",
+    r"^would it be (?:a |an |the )?([a-zA-Z0-9\s-]+)\??$",
+    r"^are you thinking of (?:a |an |the )?([a-zA-Z0-9\s-]+)" r"\??$",
+    r"^is the answer (?:a |an |the )?([a-zA-Z0-9\s-]+)\??$",
+    # Simple pattern for "umbrella?" or "elephant?"
+    r"^([a-zA-Z0-9\s-]+)\??$",
+)
+
+
+def _combine(patterns: Tuple[str, ...], prefix: str) -> Pattern:
+    """Compile patterns into one alternation, wrapping each in a named group `<prefix><index>`.
+
+    Alternatives are tried in list order, so the first pattern that matches wins exactly as it
+    would when looping over the patterns one by one.
+    """
+    return re.compile("|".join(f"(?P<{prefix}{index}>{pattern})" for index, pattern in enumerate(patterns)))
+
+
+_INVALID_REGEX = _combine(INVALID_PATTERNS, "invalid_")
+# When every pattern is anchored at the start, matching there is equivalent to searching and
+# avoids rescanning the rest of the question
+_INVALID_SEARCH = (
+    _INVALID_REGEX.match if all(p.startswith("^") for p in INVALID_PATTERNS) else _INVALID_REGEX.search
+)
+_INVALID_GROUP_PATTERNS = {f"invalid_{index}": pattern for index, pattern in enumerate(INVALID_PATTERNS)}
+_DIRECT_GUESS_REGEX = _combine(DIRECT_GUESS_PATTERNS, "guess_")
+# The guess is captured by the group directly following each pattern's named wrapper group
+_GUESS_GROUPS = {
+    f"guess_{index}": _DIRECT_GUESS_REGEX.groupindex[f"guess_{index}"] + 1
+    for index in range(len(DIRECT_GUESS_PATTERNS))
+}
+
+
+def extract_guess(question: str) -> Optional[str]:
+    """Extract the guess from a question if it's a direct guess.
+
+    Shared by win detection and everything else that needs to recognise direct guesses, so
+    they all accept the same phrasings.
+
+    Args:
+        question: The question to extract a guess from
+
+    Returns:
+        The extracted guess if found, None otherwise
+    """
+    match = _DIRECT_GUESS_REGEX.match(question.lower().strip())
+    if match is None:
+        return None
+    return match.group(_GUESS_GROUPS[match.lastgroup]).strip()
 
 
 class QuestionValidator:
-    """Validates questions for the 20 questions game, including format and similarity checks."""
+    """Validates questions for the 20 questions game, including format and similarity checks.
+
+    Patterns are compiled once at import into combined regexes shared by all instances.
+    """
+
+    invalid_patterns = INVALID_PATTERNS
+    direct_guess_patterns = DIRECT_GUESS_PATTERNS
 
     def __init__(self, similarity_threshold: float = 0.5):
-        # Common patterns that aren't yes/no questions
-        self.invalid_patterns = [
-            r"^what",
-            r"^how",
-            r"^who",
-            r"^where",
-            r"^when",
-            r"^why",
-            r"^which",
-            r"^can you tell",
-            r"^tell me",
-        ]
         self.similarity_threshold = similarity_threshold
 
-        # Patterns to identify direct guesses
-        self.direct_guess_patterns = [
-            r"^is it (?:a |an |the )?([a-zA-Z0-9\s-]+)\??$",
-            r"^could it be (?:a |an |the )?([a-zA-Z0-9\s-]+)\??$",
-            r"^would it be (?:a |an |the )?([a-zA-Z0-9\s-]+)\??$",
-            r"^are you thinking of (?:a |an |the )?([a-zA-Z0-9\s-]+)" r"\??$",
-            r"^is the answer (?:a |an |the )?([a-zA-Z0-9\s-]+)\??$",
-            # Simple pattern for "umbrella?" or "elephant?"
-            r"^([a-zA-Z0-9\s-]+)\??$",
-        ]
+    def match_invalid_pattern(self, question: str) -> Optional[str]:
+        """Find the first invalid pattern matching an already normalized question.
+
+        Args:
+            question: Lowercased, stripped question
+
+        Returns:
+            The matching pattern, or None when the question passes
+        """
+        match = _INVALID_SEARCH(question)
+        if match is None:
+            return None
+        return _INVALID_GROUP_PATTERNS[match.lastgroup]
 
     def is_valid_question(self, question: str, game_state: GameState) -> Tuple[bool, Optional[str]]:
         """Validate if the question is properly formatted as a yes/no question.
@@ -54,13 +118,13 @@ class QuestionValidator:
             return False, error_msg
 
         # Check if it contains invalid question words
-        for pattern in self.invalid_patterns:
-            if re.search(pattern, question):
-                error_msg = f"Question starts with '{pattern}', " "it's mostly not a valid question"
-                game_state.add_error_log(
-                    LogType.VALIDATION_ERROR, error_msg, question=question, details={"pattern": pattern}
-                )
-                return False, error_msg
+        pattern = self.match_invalid_pattern(question)
+        if pattern is not None:
+            error_msg = f"Question starts with '{pattern}', " "it's mostly not a valid question"
+            game_state.add_error_log(
+                LogType.VALIDATION_ERROR, error_msg, question=question, details={"pattern": pattern}
+            )
+            return False, error_msg
         return True, None
 
     def is_similar_to_previous(
@@ -68,6 +132,10 @@ class QuestionValidator:
     ) -> Tuple[bool, str]:
         """Check if question is too similar to previous questions.
 
+        Questions are compared by Jaccard similarity of token shingles; anything above
+        similarity_threshold counts as a repeat. When checking the game's own history the
+        incrementally maintained index on the game state is used.
+
         Args:
             question: The question to check
             previous_questions: List of previously asked questions
@@ -76,17 +144,31 @@ class QuestionValidator:
         Returns:
             Tuple of (is_similar, error_message)
         """
-        question = question.lower().strip()
-
-        for prev in previous_questions:
-            prev = prev.lower().strip()
-            # Exact match check
-            if question == prev:
-                error_msg = "Question is exact same with one of the previous one"
-                game_state.add_error_log(
-                    LogType.SIMILARITY_ERROR, error_msg, question=question, details={"matched_with": prev}
-                )
-                return True, error_msg
+        if previous_questions is game_state.previous_questions:
+            index = game_state.question_index
+        else:
+            index = QuestionIndex(previous_questions)
+
+        # Exact match check
+        exact_match = index.find_exact(question)
+        if exact_match is not None:
+            error_msg = "Question is exact same with one of the previous one"
+            game_state.add_error_log(
+                LogType.SIMILARITY_ERROR, error_msg, question=question, details={"matched_with": exact_match}
+            )
+            return True, error_msg
+
+        # Near-duplicate check on token shingles
+        closest, similarity = index.most_similar(question)
+        if similarity > self.similarity_threshold:
+            error_msg = f"Question is too similar to a previous one: '{closest}'"
+            game_state.add_error_log(
+                LogType.SIMILARITY_ERROR,
+                error_msg,
+                question=question,
+                details={"matched_with": closest, "similarity": round(similarity, 3)},
+            )
+            return True, error_msg
 
         return False, None
 
@@ -99,10 +181,4 @@ class QuestionValidator:
         Returns:
             The extracted guess if found, None otherwise
         """
-        question = question.lower().strip()
-
-        for pattern in self.direct_guess_patterns:
-            match = re.match(pattern, question)
-            if match:
-                return match.group(1).strip()
-        return None
+        return extract_guess(question)
@@ -0,0 +1,201 @@
+"""Module for sharding tournament games across worker processes.
+
+Each worker process runs its own event loop of concurrent games (see tournament.py), so the
+CPU-bound parts of a game (prompt building, validation, similarity checks, logging) scale
+with the number of cores instead of sharing one interpreter. Run e.g.:
+    python worker_pool.py --games 2000 --workers 8 --concurrency 16
+"""
+# pylint: disable-msg=C0301,R0913,R0914,W0718
+import argparse
+import asyncio
+import copy
+import json
+import multiprocessing
+import os
+import queue
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from main import load_config
+from tournament import run_tournament
+
+_SUMMED_KEYS = ("guesser_wins", "host_wins", "errors", "games_skipped", "llm_retries", "llm_rate_limited")
+
+
+def shard_sizes(num_games: int, num_workers: int) -> List[int]:
+    """Split num_games into num_workers shards whose sizes differ by at most one."""
+    base, remainder = divmod(num_games, num_workers)
+    return [base + (1 if worker_index < remainder else 0) for worker_index in range(num_workers)]
+
+
+def _shard_config(config: dict, num_workers: int, first_game: int, worker_index: int = 0) -> dict:
+    """Copy of the config for one worker process.
+
+    Every process has its own scheduler, so the account wide rate limits are divided evenly
+    to keep the pool as a whole within them. The topic seed is offset by the shard's first
+    game so every game of the pool samples its topic with a distinct seed. A persistent answer
+    cache gets one SQLite file per worker (`<path>.worker_<i>`), as processes writing to one
+    database would block each other on its write lock.
+    """
+    shard_config = copy.deepcopy(config)
+    cache_path = (shard_config.get("answer_cache") or {}).get("path")
+    if cache_path:
+        shard_config["answer_cache"]["path"] = f"{cache_path}.worker_{worker_index}"
+    if shard_config.get("topics", {}).get("seed") is not None:
+        shard_config["topics"]["seed"] += first_game
+    limits = shard_config.get("rate_limits")
+    if limits:
+        for key in ("requests_per_minute", "tokens_per_minute"):
+            if limits.get(key):
+                limits[key] = limits[key] / num_workers
+        if limits.get("max_concurrency"):
+            limits["max_concurrency"] = max(1, limits["max_concurrency"] // num_workers)
+    return shard_config
+
+
+def _run_shard(
+    worker_index: int,
+    config: dict,
+    num_games: int,
+    max_concurrent_games: int,
+    output_dir: str,
+    results: multiprocessing.Queue,
+):
+    """Worker process entry point: play one shard of games and report its summary on the queue."""
+    try:
+        summary = asyncio.run(run_tournament(config, num_games, max_concurrent_games, output_dir=output_dir))
+        results.put((worker_index, summary, None))
+    except Exception as exception:
+        results.put((worker_index, None, str(exception)))
+
+
+def merge_summaries(summaries: List[dict], wall_time: float) -> dict:
+    """Merge per-worker tournament summaries into one run summary.
+
+    Args:
+        summaries: Summaries returned by run_tournament in each worker
+        wall_time: Wall time of the whole pool run in seconds
+
+    Returns:
+        dict: Summed counters plus pool wide throughput
+    """
+    merged = {key: sum(summary.get(key, 0) for summary in summaries) for key in _SUMMED_KEYS}
+    num_games = sum(summary["num_games"] for summary in summaries)
+    played = num_games - merged["games_skipped"]
+    merged.update(
+        {
+            "num_games": num_games,
+            "num_workers": len(summaries),
+            "wall_time_seconds": wall_time,
+            "games_per_minute": played / wall_time * 60 if wall_time else 0.0,
+        }
+    )
+    return merged
+
+
+def run_worker_pool(
+    config: dict,
+    num_games: int,
+    num_workers: Optional[int] = None,
+    max_concurrent_games: int = 8,
+    output_dir: Optional[str] = None,
+) -> dict:
+    """Play num_games games sharded across worker processes and merge their summaries.
+
+    Each worker writes its game logs under `<output_dir>/worker_<i>/`, so re-running with the
+    same output_dir and worker count resumes interrupted shards. Workers report their
+    summaries through a queue; the merged summary is written to `<output_dir>/summary.json`.
+
+    Args:
+        config: Game configuration shared by every game
+        num_games: Number of games to play in total
+        num_workers: Worker processes, defaults to the number of CPUs
+        max_concurrent_games: Games in flight per worker
+        output_dir: Directory for the per-worker logs and the merged summary
+
+    Returns:
+        dict: Merged summary, with the per-worker summaries under "workers"
+    """
+    num_workers = max(1, min(num_workers or os.cpu_count() or 1, num_games))
+    if output_dir is None:
+        output_dir = os.path.join("output", "worker_pool", datetime.now().strftime("%Y%m%d_%H%M%S"))
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Spawned workers do not inherit the parent's threads and locks
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    shards = shard_sizes(num_games, num_workers)
+    started = time.perf_counter()
+    workers = [
+        context.Process(
+            target=_run_shard,
+            args=(
+                worker_index,
+                _shard_config(config, num_workers, sum(shards[:worker_index]), worker_index),
+                shard_games,
+                max_concurrent_games,
+                os.path.join(output_dir, f"worker_{worker_index}"),
+                results,
+            ),
+            daemon=True,
+        )
+        for worker_index, shard_games in enumerate(shards)
+    ]
+    for worker in workers:
+        worker.start()
+
+    summaries, failures = {}, {}
+    while len(summaries) + len(failures) < len(workers):
+        try:
+            worker_index, summary, error = results.get(timeout=1.0)
+        except queue.Empty:
+            # A worker killed before reporting would otherwise be waited on forever
+            for index, worker in enumerate(workers):
+                if worker.exitcode not in (None, 0) and index not in summaries:
+                    failures.setdefault(index, f"worker exited with code {worker.exitcode}")
+            continue
+        if error is None:
+            summaries[worker_index] = summary
+        else:
+            failures[worker_index] = error
+    wall_time = time.perf_counter() - started
+    for worker in workers:
+        worker.join()
+
+    merged = merge_summaries([summaries[index] for index in sorted(summaries)], wall_time)
+    merged["game_mode"] = config["game_mode"]
+    merged["max_concurrent_games_per_worker"] = max_concurrent_games
+    merged["failed_workers"] = {str(index): error for index, error in sorted(failures.items())}
+    merged["workers"] = [summaries[index] for index in sorted(summaries)]
+    with open(os.path.join(output_dir, "summary.json"), "w", encoding="utf-8") as summary_file:
+        json.dump(merged, summary_file, indent=2)
+    return merged
+
+
+def main():
+    """Command line entry point for worker pool runs."""
+    parser = argparse.ArgumentParser(description="Play a batch of 20 questions games across worker processes")
+    parser.add_argument("--games", type=int, default=100, help="number of games to play")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to CPU count")
+    parser.add_argument("--concurrency", type=int, default=8, help="maximum games in flight per worker")
+    parser.add_argument("--config", default="config.json", help="path to the game config")
+    parser.add_argument("--output-dir", default=None, help="directory for game logs and summary")
+    args = parser.parse_args()
+
+    summary = run_worker_pool(
+        load_config(args.config), args.games, args.workers, args.concurrency, output_dir=args.output_dir
+    )
+    print(
+        f"Played {summary['num_games']} games on {summary['num_workers']} workers in {summary['wall_time_seconds']:.1f}s"
+    )
+    print(f"Throughput: {summary['games_per_minute']:.1f} games/minute")
+    print(
+        f"Guesser wins: {summary['guesser_wins']}, host wins: {summary['host_wins']}, errors: {summary['errors']}"
+    )
+    if summary["failed_workers"]:
+        print(f"Failed workers: {summary['failed_workers']}")
+
+
+if __name__ == "__main__":
+    main()